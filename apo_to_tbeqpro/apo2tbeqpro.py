@@ -1,13 +1,15 @@
 import os
 import sys
 import re
+import json
+import argparse
 import platform
 import subprocess
-import xml.etree.ElementTree as ET
+import io
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from xml.dom import minidom
-import tkinter as tk
-from tkinter import simpledialog, messagebox
 
 # --- 1. APO DOMAIN MODEL (Full Specification) ---
 
@@ -36,44 +38,76 @@ class APOGraphicEQ(APOCommand):
         super().__init__(**ctx)
         self.points = points # List of (freq, gain) tuples
 
+# Precompiled grammar: one pass over each line dispatches on the directive keyword
+_DIRECTIVE = re.compile(r"^(Preamp|Filter(?:\s+\d+)?|Device|Channel|Stage|Include|GraphicEQ):\s*(.*)", re.I)
+_PREAMP = re.compile(r"^([-\d.]+)\s*dB", re.I)
+_FILTER = re.compile(r"^(ON|OFF)\s+([A-Z0-9]+)\s+Fc\s+([\d.]+)\s+Hz(?:(?:\s+Gain\s+([-\d.]+)\s+dB)?(?:\s+(?:Q|BW Oct)\s+([\d.]+))?)?", re.I)
+_STAGE = re.compile(r"^(pre-mix|post-mix|capture)", re.I)
+
+# Tokenized files keyed by resolved path: path -> (mtime_ns, tokens)
+_TOKEN_CACHE = {}
+
+def _tokenize(path: Path):
+    """Reduces an APO file to a context-free list of (kind, value) tokens."""
+    tokens = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            m = _DIRECTIVE.match(line)
+            if not m: continue
+            kind, arg = m.group(1).split()[0].lower(), m.group(2)
+
+            if kind in ("device", "channel"): tokens.append((kind, arg))
+            elif kind == "include": tokens.append((kind, arg.strip()))
+            elif kind == "stage":
+                if sm := _STAGE.match(arg): tokens.append((kind, sm.group(1)))
+            elif kind == "preamp":
+                if pm := _PREAMP.match(arg): tokens.append((kind, pm.group(1)))
+            elif kind == "filter":
+                if fm := _FILTER.match(arg): tokens.append((kind, fm.groups()))
+            elif kind == "graphiceq":
+                pairs = [p.strip().split(' ') for p in arg.split(';') if p.strip()]
+                tokens.append((kind, [(float(p[0]), float(p[1])) for p in pairs if len(p)==2]))
+    return tokens
+
+def _load_tokens(path: Path):
+    """Returns cached tokens for a file, re-tokenizing only when its mtime changes."""
+    mtime = path.stat().st_mtime_ns
+    cached = _TOKEN_CACHE.get(path)
+    if cached and cached[0] == mtime: return cached[1]
+    tokens = _tokenize(path)
+    _TOKEN_CACHE[path] = (mtime, tokens)
+    return tokens
+
 class APOModel:
     """Recursively parses APO files and maintains state contexts."""
     def __init__(self, main_file_path: Path):
         self.commands = []
+        self.files = []  # Resolved paths of the main file and everything it includes, in parse order
         self.root_path = main_file_path.parent
         self._parse_file(main_file_path)
 
-    def _parse_file(self, path: Path, device="all", channel="all", stage="post-mix"):
+    def _parse_file(self, path: Path, device="all", channel="all", stage="post-mix", chain=()):
         if not path.exists(): return
+        path = path.resolve()
+        if path in chain:
+            raise ValueError("Include cycle: " + " -> ".join(p.name for p in (*chain, path)))
+        self.files.append(path)
 
-        patterns = {
-            'preamp': re.compile(r"^Preamp:\s*([-\d.]+)\s*dB", re.I),
-            'filter': re.compile(r"^Filter(?:\s+\d+)?:\s*(ON|OFF)\s+([A-Z0-9]+)\s+Fc\s+([\d.]+)\s+Hz(?:(?:\s+Gain\s+([-\d.]+)\s+dB)?(?:\s+(?:Q|BW Oct)\s+([\d.]+))?)?", re.I),
-            'device': re.compile(r"^Device:\s*(.*)", re.I),
-            'channel': re.compile(r"^Channel:\s*(.*)", re.I),
-            'stage': re.compile(r"^Stage:\s*(pre-mix|post-mix|capture)", re.I),
-            'include': re.compile(r"^Include:\s*(.*)", re.I),
-            'graphic': re.compile(r"^GraphicEQ:\s*(.*)", re.I)
-        }
-
-        with open(path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"): continue
-
-                if m := patterns['device'].match(line): device = m.group(1)
-                elif m := patterns['channel'].match(line): channel = m.group(1)
-                elif m := patterns['stage'].match(line): stage = m.group(1)
-                elif m := patterns['include'].match(line):
-                    self._parse_file(self.root_path / m.group(1).strip(), device, channel, stage)
-                elif m := patterns['preamp'].match(line):
-                    self.commands.append(APOPreamp(m.group(1), device=device, channel=channel, stage=stage))
-                elif m := patterns['filter'].match(line):
-                    on_off, kind, fc, gain, q = m.groups()
-                    self.commands.append(APOFilter(kind, fc, gain or 0, q or 0.707, on_off.upper()=="ON", device=device, channel=channel, stage=stage))
-                elif m := patterns['graphic'].match(line):
-                    pairs = [p.strip().split(' ') for p in m.group(1).split(';') if p.strip()]
-                    self.commands.append(APOGraphicEQ([(float(p[0]), float(p[1])) for p in pairs if len(p)==2], device=device, channel=channel, stage=stage))
+        for kind, value in _load_tokens(path):
+            if kind == "device": device = value
+            elif kind == "channel": channel = value
+            elif kind == "stage": stage = value
+            elif kind == "include":
+                self._parse_file(self.root_path / value, device, channel, stage, (*chain, path))
+            elif kind == "preamp":
+                self.commands.append(APOPreamp(value, device=device, channel=channel, stage=stage))
+            elif kind == "filter":
+                on_off, fkind, fc, gain, q = value
+                self.commands.append(APOFilter(fkind, fc, gain or 0, q or 0.707, on_off.upper()=="ON", device=device, channel=channel, stage=stage))
+            elif kind == "graphiceq":
+                self.commands.append(APOGraphicEQ(value, device=device, channel=channel, stage=stage))
 
 # --- 2. TONEBOOSTERS XML MODEL ---
 
@@ -103,12 +137,39 @@ class TBProgram:
             hue = self._hues[len(self.bands) % len(self._hues)]
             self.bands.append(TBBand(len(self.bands)+1, cmd, hue))
 
-    def to_xml_string(self):
-        tpb = ET.Element("tpb", manufacturerCode="1414483522", pluginCode="1412515152")
+    def write_xml(self, fh):
+        """Streams the preset to a text file handle in a single pass (same bytes as minidom's pretty printer)."""
         attr = {"Name": self.name, "Category": "Presets", "OutGain": self.out_gain, "ScnIdx": str(len(self.bands))}
         for b in self.bands: attr.update(b.attrs)
-        ET.SubElement(tpb, "Program", attr)
-        return minidom.parseString(ET.tostring(tpb)).toprettyxml(indent="  ")
+        fh.write('<?xml version="1.0" ?>\n<tpb manufacturerCode="1414483522" pluginCode="1412515152">\n  <Program')
+        for k, v in attr.items():
+            fh.write(f' {k}="{_escape_attr(v)}"')
+        fh.write('/>\n</tpb>\n')
+
+    def to_xml_string(self):
+        buf = io.StringIO()
+        self.write_xml(buf)
+        return buf.getvalue()
+
+def _escape_attr(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+def build_program(path: Path, apo=None) -> TBProgram:
+    """Converts a single APO config (or its parsed APOModel) into a TB Equalizer Pro program."""
+    apo = apo or APOModel(path)
+    preamp_val = sum(c.db for c in apo.commands if isinstance(c, APOPreamp))
+    prog = TBProgram(path.stem, preamp_val)
+    for cmd in apo.commands:
+        if isinstance(cmd, APOFilter): prog.add_filter(cmd)
+    return prog
+
+def default_target_dir():
+    """Returns the TB Equalizer Pro user program folder, or None on unsupported systems."""
+    os_name = platform.system()
+    if os_name == "Windows": return Path(os.environ['APPDATA']) / "Toneboosters/TB Equalizer Pro_programs/User/Converted"
+    if os_name == "Linux": return Path.home() / ".config/Toneboosters/TB Equalizer Pro_programs/User/Converted"
+    if os_name == "Darwin": return Path.home() / "Music/Toneboosters/TB Equalizer Pro_programs/User/Converted"
+    return None
 
 # --- 3. APPLICATION CONTROLLER ---
 
@@ -118,13 +179,14 @@ class ConverterApp:
         self.target_dir.mkdir(parents=True, exist_ok=True)
 
     def _resolve_dir(self):
-        os_name = platform.system()
-        if os_name == "Windows": return Path(os.environ['APPDATA']) / "Toneboosters/TB Equalizer Pro_programs/User/Converted"
-        if os_name == "Linux": return Path.home() / ".config/Toneboosters/TB Equalizer Pro_programs/User/Converted"
-        if os_name == "Darwin": return Path.home() / "Music/Toneboosters/TB Equalizer Pro_programs/User/Converted"
-        self._dialog("Unknown OS", f"Unsupported operating system: {os_name}", True); sys.exit()
+        target_dir = default_target_dir()
+        if target_dir is None:
+            self._dialog("Unknown OS", f"Unsupported operating system: {platform.system()}", True); sys.exit()
+        return target_dir
 
     def _dialog(self, title, msg, is_err=False):
+        import tkinter as tk
+        from tkinter import messagebox
         root = tk.Tk(); root.withdraw()
         if is_err: messagebox.showerror(title, msg)
         else: messagebox.showinfo(title, msg)
@@ -132,6 +194,8 @@ class ConverterApp:
 
     def _get_unique_dest(self, dest: Path):
         if not dest.exists(): return dest
+        import tkinter as tk
+        from tkinter import simpledialog
         root = tk.Tk(); root.withdraw()
         new_name = simpledialog.askstring("File Conflict", f"Rename '{dest.name}':", initialvalue=dest.stem+"_new.xml")
         root.destroy()
@@ -146,15 +210,11 @@ class ConverterApp:
 
         for p in file_paths:
             try:
-                apo = APOModel(p)
-                preamp_val = sum(c.db for c in apo.commands if isinstance(c, APOPreamp))
-                prog = TBProgram(p.stem, preamp_val)
-                for cmd in apo.commands:
-                    if isinstance(cmd, APOFilter): prog.add_filter(cmd)
-                
+                prog = build_program(p)
                 dest = self._get_unique_dest(self.target_dir / f"{p.stem}.xml")
                 if dest:
-                    dest.write_text(prog.to_xml_string(), encoding='utf-8')
+                    with open(dest, 'w', encoding='utf-8') as fh:
+                        prog.write_xml(fh)
                     success_count += 1
             except Exception as e:
                 error_log.append(f"{p.name}: {str(e)}")
@@ -170,5 +230,165 @@ class ConverterApp:
         # Open folder on Windows
         if platform.system() == "Windows": os.startfile(self.target_dir)
 
+# --- 4. HEADLESS BATCH MODE ---
+
+CONFLICT_POLICIES = ("skip", "overwrite", "suffix")
+
+def render_one(src: str, target_dir: str) -> dict:
+    """Worker entry point: converts src into a hidden temporary file in target_dir.
+
+    Returns the temporary file and the files src includes; the parent picks
+    the final names (place_outputs), so each config is parsed only once.
+    """
+    p = Path(src)
+    rendered = {"source": src, "temp": None, "includes": [], "error": None}
+    try:
+        apo = APOModel(p)
+        rendered["includes"] = [str(f) for f in apo.files[1:]]
+        prog = build_program(p, apo)
+        fd, temp = tempfile.mkstemp(prefix=".apo2tb-", suffix=".part", dir=target_dir)
+        try:
+            with open(fd, 'w', encoding='utf-8') as handle:
+                prog.write_xml(handle)
+        except BaseException:
+            os.unlink(temp)  # No half-written program in the target folder
+            raise
+        rendered["temp"] = temp
+    except Exception as e:
+        rendered["error"] = str(e)
+    return rendered
+
+def _result(source, dest=None, status="converted", error=None, reason=None) -> dict:
+    return {"source": source, "dest": None if dest is None else str(dest), "status": status,
+            "error": error, "reason": reason}
+
+def _place(temp: str, stem: str, target_dir: Path, policy: str, taken: dict):
+    """Moves temp to its program file. Returns (dest, None), or (None, reason) when skipped."""
+    if policy == "suffix":
+        n = 0
+        while True:
+            name = stem if n == 0 else f"{stem}_{n}"
+            dest, n = target_dir / f"{name}.xml", n + 1
+            if name.lower() in taken: continue
+            try:
+                # Exclusive create reserves the name, also against other writers
+                open(dest, 'x').close()
+            except FileExistsError:
+                continue
+            os.replace(temp, dest)
+            return dest, None
+    dest = target_dir / f"{stem}.xml"
+    if stem.lower() in taken:
+        os.unlink(temp)
+        return None, f"Same program name as {taken[stem.lower()]}"
+    if policy == "skip" and dest.exists():
+        os.unlink(temp)
+        return None, "Output file exists"
+    os.replace(temp, dest)
+    return dest, None
+
+def place_outputs(rendered, target_dir: Path, policy: str):
+    """Names the rendered programs in sorted input order; returns (results, fragments).
+
+    Inputs that another input includes are fragments of a config, not programs:
+    their renders are dropped. Inputs with the same program name (the file stem,
+    case-insensitive) are resolved by policy like files already in target_dir:
+    suffix numbers them (p1.xml, p1_1.xml), skip keeps the first and overwrite
+    the last of them. Inputs in an include cycle fail to parse and are errors.
+    """
+    included = {inc for r in rendered for inc in r["includes"]}
+    results, fragments, taken = [], [], {}  # taken: lower-case name -> source that got it
+    ordered = sorted(rendered, key=lambda r: r["source"])
+    if policy == "overwrite": ordered.reverse()  # The last input wins, so it claims the name first
+    for r in ordered:
+        src, temp = Path(r["source"]), r["temp"]
+        if r["error"] is not None:
+            results.append(_result(r["source"], status="error", error=r["error"]))
+        elif str(src.resolve()) in included:
+            os.unlink(temp)
+            fragments.append(r["source"])
+        else:
+            try:
+                dest, reason = _place(temp, src.stem, target_dir, policy, taken)
+            except OSError as e:
+                Path(temp).unlink(missing_ok=True)
+                results.append(_result(r["source"], status="error", error=str(e)))
+                continue
+            if dest is None:
+                results.append(_result(r["source"], status="skipped", reason=reason))
+            else:
+                taken[dest.stem.lower()] = r["source"]
+                results.append(_result(r["source"], dest))
+    results.sort(key=lambda r: r["source"])
+    return results, sorted(fragments)
+
+def convert_batch(files, target_dir: Path, policy="suffix", map_fn=map):
+    """Converts files into target_dir; map_fn runs the renders (e.g. a process pool's map).
+
+    Returns (results, fragments) as place_outputs does.
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    rendered = list(map_fn(partial(render_one, target_dir=str(target_dir)), [str(f) for f in files]))
+    return place_outputs(rendered, target_dir, policy)
+
+class BatchConverter:
+    """Unattended converter: walks directories, converts in a process pool and never touches tkinter."""
+    def __init__(self, inputs, target_dir: Path, policy="suffix", jobs=None, summary=None):
+        self.inputs = [Path(i) for i in inputs]
+        self.target_dir = target_dir
+        self.policy = policy
+        self.jobs = jobs
+        self.summary = summary
+
+    def collect(self):
+        files = []
+        for p in self.inputs:
+            if p.is_dir(): files.extend(sorted(f for f in p.rglob("*") if f.is_file() and f.suffix.lower() == ".txt"))
+            elif p.suffix.lower() == ".txt": files.append(p)
+        return files
+
+    def run(self) -> int:
+        files = self.collect()
+        if files:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results, fragments = convert_batch(files, self.target_dir, self.policy, pool.map)
+        else:
+            self.target_dir.mkdir(parents=True, exist_ok=True)
+            results, fragments = [], []
+
+        report = {
+            "target_dir": str(self.target_dir),
+            "policy": self.policy,
+            "total": len(results),
+            "converted": sum(r["status"] == "converted" for r in results),
+            "skipped": sum(r["status"] == "skipped" for r in results),
+            "errors": sum(r["status"] == "error" for r in results),
+            "includes": fragments,
+            "files": results
+        }
+        text = json.dumps(report, indent=2)
+        if self.summary: Path(self.summary).write_text(text + "\n", encoding='utf-8')
+        else: print(text)
+        return 1 if report["errors"] else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert EqualizerAPO configs to TB Equalizer Pro programs.")
+    parser.add_argument("inputs", nargs="*", help="APO .txt files (or directories with --batch)")
+    parser.add_argument("--batch", action="store_true", help="Headless mode: no dialogs, parallel conversion, JSON summary")
+    parser.add_argument("--out", type=Path, help="Output directory (default: TB Equalizer Pro user folder)")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default="suffix", help="What to do when the output file exists")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--summary", help="Write the JSON summary to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        ConverterApp().run()
+        return 0
+
+    target_dir = args.out or default_target_dir()
+    if target_dir is None:
+        parser.error(f"Unsupported operating system: {platform.system()} (pass --out)")
+    return BatchConverter(args.inputs, target_dir, args.on_conflict, args.jobs, args.summary).run()
+
 if __name__ == "__main__":
-    ConverterApp().run()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
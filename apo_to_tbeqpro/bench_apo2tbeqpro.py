@@ -0,0 +1,71 @@
+"""Per-preset cost of the conversion steps: APO parse vs. XML serialization.
+
+Usage: python bench_apo2tbeqpro.py [presets] [filters_per_preset]
+"""
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from xml.dom import minidom
+
+import apo2tbeqpro as conv
+
+def legacy_xml_string(prog: conv.TBProgram) -> str:
+    """Former ElementTree -> tostring -> minidom round trip, kept as the reference output."""
+    tpb = ET.Element("tpb", manufacturerCode="1414483522", pluginCode="1412515152")
+    attr = {"Name": prog.name, "Category": "Presets", "OutGain": prog.out_gain, "ScnIdx": str(len(prog.bands))}
+    for b in prog.bands: attr.update(b.attrs)
+    ET.SubElement(tpb, "Program", attr)
+    return minidom.parseString(ET.tostring(tpb)).toprettyxml(indent="  ")
+
+def make_presets(root: Path, count: int, filters: int):
+    (root / "shared.txt").write_text("Preamp: -2.5 dB\nFilter: ON LSC Fc 105 Hz Gain 4.0 dB Q 0.70\n")
+    paths = []
+    for i in range(count):
+        lines = [f"Preamp: -{i % 7}.0 dB", "Include: shared.txt"]
+        lines += [f"Filter {n+1}: ON PK Fc {40 + n * 97} Hz Gain {(n % 9) - 4}.5 dB Q 1.{n % 10}" for n in range(filters)]
+        p = root / f"preset_{i:04d}.txt"
+        p.write_text("\n".join(lines) + "\n")
+        paths.append(p)
+    return paths
+
+def per_preset_us(fn, items):
+    start = time.perf_counter()
+    for item in items: fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    filters = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        paths = make_presets(root, count, filters)
+
+        conv._TOKEN_CACHE.clear()
+        parse_cold = per_preset_us(conv.build_program, paths)
+        parse_warm = per_preset_us(conv.build_program, paths)
+        programs = [conv.build_program(p) for p in paths]
+
+        mismatches = sum(legacy_xml_string(p) != p.to_xml_string() for p in programs)
+        legacy = per_preset_us(legacy_xml_string, programs)
+        streaming = per_preset_us(conv.TBProgram.to_xml_string, programs)
+
+        out = root / "out.xml"
+        def write_legacy(p): out.write_text(legacy_xml_string(p), encoding='utf-8')
+        def write_stream(p):
+            with open(out, 'w', encoding='utf-8') as fh: p.write_xml(fh)
+        legacy_file = per_preset_us(write_legacy, programs)
+        stream_file = per_preset_us(write_stream, programs)
+
+    print(f"{count} presets, {filters} filters each (per-preset cost, microseconds)")
+    print(f"  parse (cold include cache):  {parse_cold:8.1f}")
+    print(f"  parse (warm include cache):  {parse_warm:8.1f}")
+    print(f"  xml string, minidom:         {legacy:8.1f}")
+    print(f"  xml string, streaming:       {streaming:8.1f}")
+    print(f"  xml to file, minidom:        {legacy_file:8.1f}")
+    print(f"  xml to file, streaming:      {stream_file:8.1f}")
+    print(f"  output mismatches:           {mismatches}")
+
+if __name__ == "__main__":
+    main()
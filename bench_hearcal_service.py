@@ -0,0 +1,128 @@
+"""Throughput of the warm service against one cold process per job.
+
+For averaging and APO -> TB conversion, each job runs three ways: as a
+fresh hearcal_avg.py / apo2tbeqpro.py --batch process (the cold path), as a
+request on one persistent client connection, and as a hearcal_service.py
+client process per job. Resampling has no cold command and is measured
+warm only.
+
+Usage: python bench_hearcal_service.py [cold_jobs] [warm_jobs]
+"""
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from hearcal_profile import frequency_grid
+from hearcal_service import Client
+
+ROOT = Path(__file__).resolve().parent
+SERVICE = [sys.executable, str(ROOT / "hearcal_service.py")]
+STARTUP_TIMEOUT = 60.0  # s
+
+def write_inputs(root: Path, profiles=12, presets=12):
+    """Synthetic profiles on mixed grids and APO presets sharing an include."""
+    rng = np.random.default_rng(0)
+    for i in range(profiles):
+        freqs = sorted(frequency_grid(3 if i % 2 else 6))
+        rows = "".join(f"{f:.2f},{db:.2f}\n" for f, db in zip(freqs, rng.normal(0, 2, len(freqs))))
+        (root / f"profile_{i:02d}.csv").write_text("frequency,raw\n" + rows)
+    (root / "shared.txt").write_text("Preamp: -2.5 dB\nFilter: ON LSC Fc 105 Hz Gain 4.0 dB Q 0.70\n")
+    for i in range(presets):
+        lines = [f"Preamp: -{i % 7}.0 dB", "Include: shared.txt"]
+        lines += [f"Filter {n+1}: ON PK Fc {40 + n * 97} Hz Gain {(n % 9) - 4}.5 dB Q 1.{n % 10}" for n in range(10)]
+        (root / f"preset_{i:02d}.txt").write_text("\n".join(lines) + "\n")
+
+def average_files(root: Path, job: int):
+    """Job i averages 4 of the profiles, so sets repeat and overlap as in a re-run archive."""
+    return [str(root / f"profile_{(job + k) % 12:02d}.csv") for k in range(4)]
+
+def per_job_ms(fn, jobs):
+    start = time.perf_counter()
+    for job in range(jobs):
+        fn(job)
+    return (time.perf_counter() - start) / jobs * 1000
+
+def run(cmd):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, cwd=ROOT)
+
+def connect(server, port):
+    """Client for the server started as process server, once it accepts connections."""
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    while True:
+        try:
+            return Client(port)
+        except ConnectionRefusedError:
+            if server.poll() is not None:
+                raise RuntimeError(f"Service exited with status {server.returncode} before accepting connections")
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Service did not accept connections within {STARTUP_TIMEOUT:.0f} s")
+            time.sleep(0.05)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def main():
+    cold_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    warm_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_inputs(root)
+        out = str(root / "out")
+        client_cmd = SERVICE + ["--port", str(port)]
+
+        start = time.perf_counter()
+        server = subprocess.Popen(client_cmd + ["serve"], stdout=subprocess.DEVNULL, cwd=ROOT)
+        stopped = False
+        try:
+            client = connect(server, port)
+            startup = (time.perf_counter() - start) * 1000
+            results = {}
+            with client:
+                results["average"] = (
+                    per_job_ms(lambda j: run([sys.executable, "hearcal_avg.py", *average_files(root, j), "--out", out]),
+                               cold_jobs),
+                    per_job_ms(lambda j: client.call("average", files=average_files(root, j), out_dir=out), warm_jobs),
+                    per_job_ms(lambda j: run(client_cmd + ["average", *average_files(root, j), "--out", out]),
+                               cold_jobs))
+                preset = lambda j: str(root / f"preset_{j % 12:02d}.txt")
+                results["convert"] = (
+                    per_job_ms(lambda j: run([sys.executable, "apo_to_tbeqpro/apo2tbeqpro.py", "--batch", preset(j),
+                                              "--out", out, "--on-conflict", "overwrite"]), cold_jobs),
+                    per_job_ms(lambda j: client.call("convert", files=[preset(j)], out_dir=out, policy="overwrite"),
+                               warm_jobs),
+                    per_job_ms(lambda j: run(client_cmd + ["convert", preset(j), "--out", out,
+                                                           "--on-conflict", "overwrite"]), cold_jobs))
+                profile = lambda j: str(root / f"profile_{j % 12:02d}.csv")
+                results["resample"] = (
+                    None,
+                    per_job_ms(lambda j: client.call("resample", file=profile(j), grid=12), warm_jobs),
+                    per_job_ms(lambda j: run(client_cmd + ["resample", profile(j), "--grid", "12"]), cold_jobs))
+                client.call("stop")
+                stopped = True
+        finally:
+            # After a failed job the service is still running: take it down rather than wait for it
+            if not stopped:
+                server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+    print(f"per-job time in ms ({cold_jobs} cold / {warm_jobs} warm jobs; service start-up {startup:.0f} ms)")
+    print(f"  {'job':<10} {'cold process':>13} {'warm, 1 conn':>13} {'warm, CLI':>10} {'speed-up':>9}")
+    for name, (cold, warm, cli) in results.items():
+        speedup = f"{cold / warm:8.0f}x" if cold else "-".rjust(9)
+        cold_txt = f"{cold:13.1f}" if cold else "-".rjust(13)
+        print(f"  {name:<10} {cold_txt} {warm:13.2f} {cli:10.1f} {speedup}")
+
+if __name__ == "__main__":
+    main()
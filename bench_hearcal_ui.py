@@ -0,0 +1,181 @@
+"""UI responsiveness benchmark: drives the Textual apps with Pilot against a null audio backend.
+
+Each scenario replays a key sequence and records, per key, the frame
+latency (key sent until the app is idle and the screen refreshed) and,
+per action, the time spent inside the action handler.
+
+Usage:
+    python bench_hearcal_ui.py [--scenarios file.json] [--only name ...] [--json results.json]
+
+A scenarios file maps names to {"app": "hearcal" | "averager", "keys": [...], "args": {...}};
+"args" are passed to HearCal (e.g. {"grid_fraction": 12}).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import numpy as np
+
+import hearcal
+import hearcal_avg
+import hearcal_profile
+
+BLOCK_FRAMES = 512
+
+SCENARIOS = {
+    "sweep_bands": {"app": "hearcal", "keys": ["space", "t"] + ["right"] * 29 + ["left"] * 29},
+    "hammer_gain": {"app": "hearcal", "keys": ["space", "t", "right"] + ["up"] * 40 + ["down"] * 40},
+    "hammer_gain_noise": {"app": "hearcal", "keys": ["f1", "space", "t", "right"] + ["up"] * 20 + ["down"] * 20},
+    "toggle_waveform": {"app": "hearcal", "keys": ["space"] + ["f1"] * 10 + ["t"] * 10},
+    "fine_grid_sweep": {"app": "hearcal", "args": {"grid_fraction": 12}, "keys": ["space", "t"] + ["right"] * 60},
+    "verification": {"app": "hearcal", "keys": ["v", "p"] + ["right", "up", "down"] * 10 + ["r", "a", "f1", "escape"]},
+    "calibration": {"app": "hearcal", "keys": ["c"] + ["down"] * 3 + ["right"] + ["down"] * 3 + ["left", "up", "escape"]},
+    "per_ear": {"app": "hearcal", "args": {"per_ear": True},
+                "keys": ["space", "t", "right"] + ["up"] * 10 + ["e"] + ["up"] * 10 + ["b", "e"]},
+    "averager": {"app": "averager", "keys": ["space", "down"] * 10 + ["up"] * 10},
+}
+
+class NullAudioEngine(hearcal.AudioEngine):
+    """AudioEngine without a device: a clock thread pulls blocks through the real callback."""
+    def __init__(self, latency=0.02, channels=1):
+        super().__init__(channels)
+        self.latency = latency
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        outdata = np.zeros((BLOCK_FRAMES, self.channels), dtype=np.float32)
+        period = BLOCK_FRAMES / hearcal.SAMPLE_RATE
+        start = time.perf_counter()
+        while self.running:
+            now = time.perf_counter() - start
+            time_info = types.SimpleNamespace(currentTime=now, outputBufferDacTime=now + self.latency)
+            self.callback(outdata, BLOCK_FRAMES, time_info, None)
+            time.sleep(period)
+
+def instrument(classes, timings):
+    """Wrap every action_* method of classes to record handler durations; returns an undo function."""
+    originals = []
+    for cls in classes:
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("action_") or not callable(method):
+                continue
+            label = f"{cls.__name__}.{name[7:]}"
+            def wrapper(*args, _method=method, _label=label, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    timings.setdefault(_label, []).append(time.perf_counter() - start)
+            setattr(cls, name, functools.wraps(method)(wrapper))
+            originals.append((cls, name, method))
+    def undo():
+        for cls, name, method in originals:
+            setattr(cls, name, method)
+    return undo
+
+def write_profiles(count=12):
+    """Synthetic hearing profiles for the averager's file browser."""
+    rng = np.random.default_rng(0)
+    freqs = sorted(hearcal_profile.ISO_FREQS)
+    for i in range(count):
+        with open(f"bench_profile_{i:02d}.csv", "w") as f:
+            f.write("frequency,raw\n")
+            for freq, db in zip(freqs, rng.normal(0, 2, len(freqs))):
+                f.write(f"{freq:.2f},{db:.2f}\n")
+
+async def run_scenario(spec):
+    handler_times = {}
+    frame_times = []
+    if os.path.exists(hearcal.JOURNAL_FILE):
+        os.remove(hearcal.JOURNAL_FILE)  # Otherwise the next run opens on the recovery prompt
+    if spec["app"] == "averager":
+        app = hearcal_avg.HearCalAverager()
+        classes = [hearcal_avg.MultiFileBrowser, hearcal_avg.HearCalAverager]
+    else:
+        # In-process rendering unless the scenario asks for render workers
+        args = {"render_workers": 0, **spec.get("args", {})}
+        engine = NullAudioEngine(channels=2 if args.get("per_ear") else 1)
+        app = hearcal.HearCal(audio_engine=engine, **args)
+        classes = [hearcal.HearCal, hearcal.VerificationScreen, hearcal.LoudnessCalibrationScreen,
+                   hearcal.StaircaseScreen]
+    undo = instrument(classes, handler_times)
+    try:
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            for key in spec["keys"]:
+                start = time.perf_counter()
+                await pilot.press(key)
+                frame_times.append(time.perf_counter() - start)
+            # Let pending renders finish; the averager's flow worker waits on its screen forever
+            await asyncio.gather(*(w.wait() for w in list(app.workers) if w.group == "render"))
+            await pilot.pause()
+    finally:
+        undo()
+    return handler_times, frame_times
+
+def stats_ms(values):
+    data = np.asarray(values) * 1000.0
+    p50, p95 = np.percentile(data, [50, 95])
+    return {"n": len(data), "p50": round(float(p50), 3), "p95": round(float(p95), 3), "max": round(float(data.max()), 3)}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", help="JSON file with recorded key sequences")
+    parser.add_argument("--only", nargs="*", help="Run only these scenarios")
+    parser.add_argument("--json", help="Write results to this file (regression baseline)")
+    args = parser.parse_args()
+
+    scenarios = dict(SCENARIOS)
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios = json.load(f)
+    if args.only:
+        scenarios = {name: scenarios[name] for name in args.only}
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Journals and averager outputs stay out of the working directory
+        os.chdir(tmp)
+        try:
+            write_profiles()
+            for name, spec in scenarios.items():
+                handler_times, frame_times = await run_scenario(spec)
+                results[name] = {
+                    "frame": stats_ms(frame_times),
+                    "handlers": {label: stats_ms(values) for label, values in sorted(handler_times.items())}
+                }
+        finally:
+            os.chdir(cwd)
+
+    for name, res in results.items():
+        frame = res["frame"]
+        print(f"{name}: frame latency p50 {frame['p50']:.1f} / p95 {frame['p95']:.1f} / max {frame['max']:.1f} ms (n={frame['n']})")
+        for label, h in res["handlers"].items():
+            print(f"    {label:<42} p50 {h['p50']:7.3f}  p95 {h['p95']:7.3f}  max {h['max']:7.3f} ms  (n={h['n']})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,10 +1,18 @@
 import numpy as np
-import sounddevice as sd
 import csv
+import json
 import os
 import random
 import threading
-from scipy import signal
+import time
+import argparse
+import multiprocessing
+import weakref
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from scipy import fft, signal
+from textual import work
 from textual.app import App, ComposeResult
 from textual.widgets import (
     Header, 
@@ -14,8 +22,6 @@ from textual.widgets import (
     Static, 
     ProgressBar, 
     Input, 
-    ListItem, 
-    ListView, 
     RichLog
 )
 from textual.containers import Vertical, Horizontal
@@ -23,6 +29,10 @@ from textual.binding import Binding
 from textual.screen import Screen
 from textual.message import Message
 
+from hearcal_profile import (GRID_FRACTIONS, csv_columns, frequency_grid, interpolate_log, load_profile,
+                             load_surface, load_surface_ears, save_surface)
+from hearcal_widgets import ProfileList
+
 # --- SCIENTIFIC CONSTANTS ---
 LFO_RATE = 4.0        # Hz: Psychoacoustic rate to bypass neural adaptation
 LFO_DEPTH = 0.05      # 5%: Prevents standing waves
@@ -57,11 +67,11 @@ REFERENCE_LEVELS = [
     }
 ]
 
-ISO_FREQS = [
-    1000.0, 40.0, 4000.0, 125.0, 800.0, 25.0, 500.0, 12500.0, 63.0, 2500.0, 20.0, 
-    1600.0, 31.5, 10000.0, 80.0, 2000.0, 200.0, 16000.0, 50.0, 6300.0, 315.0, 
-    20000.0, 100.0, 3150.0, 160.0, 5000.0, 250.0, 630.0, 1250.0, 400.0
-]
+JOURNAL_FILE = "hearcal_session.journal"
+
+# Per-ear sessions (--per-ear): channel gains that route the mono test signal to one ear
+EAR_ROUTES = {"left": (1.0, 0.0), "right": (0.0, 1.0)}
+BALANCE_TOLERANCE_DB = 3.0  # Left/right differences above this are flagged by the balance check
 
 class FileSelected(Message):
     def __init__(self, filename: str, mode: str, force: bool = False) -> None:
@@ -94,12 +104,42 @@ class OverwriteScreen(Screen):
             self.post_message(FileSelected(self.filename, "save", force=True))
         self.action_dismiss_screen()
 
+class RecoveryScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "discard", "Discard"),
+    ] + [
+        # Shadow the app's keys: nothing may change the session before it is restored or discarded
+        Binding(key, "ignore", "", show=False)
+        for key in ("up", "down", "left", "right", "space", "s", "l", "t", "v", "m", "c", "n", "e", "b", "f1")
+    ]
+    def __init__(self, changes: int):
+        super().__init__()
+        self.changes = changes
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="confirm_panel"):
+            yield Label("UNSAVED SESSION FOUND", id="confirm_title")
+            yield Label(f"Restore {self.changes} journaled change(s) from the last session?", id="confirm_msg")
+            with Horizontal(id="confirm_buttons"):
+                yield Button("Discard (Esc)", id="discard_rec", variant="error")
+                yield Button("Restore", id="restore_rec", variant="primary")
+
+    def action_ignore(self) -> None:
+        pass
+
+    def action_discard(self) -> None:
+        self.dismiss(False)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        self.dismiss(event.button.id == "restore_rec")
+
 class FileBrowserScreen(Screen):
     BINDINGS = [
         Binding("escape", "dismiss_screen", "Exit"), 
         Binding("enter", "submit", "Confirm"),
-        Binding("up", "ignore", "", show=False),
-        Binding("down", "ignore", "", show=False),
+        # Arrows move the list while an input has focus (and never reach the main app)
+        Binding("up", "move(-1)", "", show=False),
+        Binding("down", "move(1)", "", show=False),
         Binding("left", "ignore", "", show=False),
         Binding("right", "ignore", "", show=False)
     ]
@@ -108,20 +148,21 @@ class FileBrowserScreen(Screen):
         """Consume arrow key events to prevent bubbling to main app."""
         pass
 
+    def action_move(self, delta: int) -> None:
+        self.query_one(ProfileList).action_move(delta)
+
     def __init__(self, mode="load"):
         super().__init__()
         self.mode = mode
 
     def compose(self) -> ComposeResult:
-        files = sorted([f for f in os.listdir('.') if f.endswith('.csv')])
         with Vertical(id="browser_outer"):
             with Vertical(id="browser_panel"):
                 yield Label(f"HEARCAL: {self.mode.upper()} PROFILE", id="browser_title")
                 if self.mode == "save":
                     yield Input(placeholder="filename.csv", id="new_file_input")
-                
-                yield ListView(*[ListItem(Label(f)) for f in files], id="file_list")
-                self.file_map = files
+                yield Input(placeholder="Filter...", id="filter_input")
+                yield ProfileList(id="file_list")
                 
                 with Horizontal(id="browser_buttons"):
                     yield Button("Cancel (Esc)", id="cancel", variant="error")
@@ -134,8 +175,9 @@ class FileBrowserScreen(Screen):
         fn = self.get_selection()
         if not fn:
             return
-        if not fn.endswith(".csv"):
-            fn += ".csv"
+        if not fn.endswith((".csv", ".npz")):
+            # Multi-level sessions default to the level x frequency surface format
+            fn += ".npz" if self.app.multi_level else ".csv"
             
         if self.mode == "save" and os.path.exists(fn):
             self.app.push_screen(OverwriteScreen(fn))
@@ -145,10 +187,7 @@ class FileBrowserScreen(Screen):
 
     def get_selection(self) -> str:
         new_val = self.query_one("#new_file_input").value.strip() if self.mode == "save" else ""
-        list_view = self.query_one("#file_list")
-        if list_view.index is not None and list_view.index < len(self.file_map):
-            return new_val or self.file_map[list_view.index]
-        return new_val
+        return new_val or self.query_one(ProfileList).current or ""
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "confirm":
@@ -156,12 +195,48 @@ class FileBrowserScreen(Screen):
         else:
             self.action_dismiss_screen()
 
-    def on_list_view_selected(self, event: ListView.Selected) -> None:
+    def on_profile_list_chosen(self, event: ProfileList.Chosen) -> None:
         self.action_submit()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "filter_input":
+            self.query_one(ProfileList).filter(event.value)
     
     def on_input_submitted(self, event: Input.Submitted) -> None:
         self.action_submit()
 
+def broadband_noise(noise_type, duration=10.0, rng=None):
+    """White, pink (-3 dB/octave) or brown (-6 dB/octave) noise normalized to RMS 1.
+
+    rng is a np.random.Generator for reproducible renders (default: the global numpy RNG).
+    """
+    rng = np.random if rng is None else rng
+    samples = int(SAMPLE_RATE * duration)
+    target_rms = 1.0
+    
+    if noise_type == "white":
+        # White noise: for zero-mean Gaussian noise RMS = standard deviation
+        noise = rng.normal(loc=0.0, scale=1.0, size=samples)
+    elif noise_type == "pink":
+        # Pink noise: -3dB/octave using proper filtering
+        white = rng.normal(0, 1, samples)
+        # Design pink filter using cascaded poles (Voss algorithm approximation)
+        b = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+        a = np.array([1, -2.494956002, 2.017265875, -0.522189400])
+        noise = signal.lfilter(b, a, white)
+    else:  # brown
+        # Brown noise: -6dB/octave (integrated white noise with leak)
+        white = rng.normal(0, 1, samples)
+        # Use leaky integrator with coefficient tuned to match reference
+        # 0.9995 balances bass energy to match reference brown noise spectrum
+        noise = signal.lfilter([1.0], [1.0, -0.9995], white)
+    # Normalize to exact target RMS
+    current_rms = np.sqrt(np.mean(noise**2))
+    if current_rms > 0:
+        noise = noise * (target_rms / current_rms)
+    
+    return noise.astype(np.float32)
+
 class LoudnessCalibrationScreen(Screen):
     BINDINGS = [
         Binding("escape", "dismiss_screen", "Exit")
@@ -171,7 +246,7 @@ class LoudnessCalibrationScreen(Screen):
         super().__init__()
         self.noise_type = "white"  # "white", "pink", "brown"
         self.active_panel = "level"  # "level" or "noise”
-        self.noise_cache = {}  # Cache for generated noise: (noise_type, level_idx) -> samples
+        self.noise_cache = {}  # Cache for generated noise: noise_type -> unit-RMS samples
 
     def compose(self) -> ComposeResult:
         with Vertical(id="cal_container"):
@@ -189,13 +264,17 @@ class LoudnessCalibrationScreen(Screen):
                     yield Label("", id="noise_opt1")
                     yield Label("", id="noise_opt2")
                     yield Label("", id="noise_opt3")
+            yield Label("", id="meter_label")
 
     def on_mount(self):
         self.update_display()
         self.play_noise()
     
     def on_key(self, event):
-        """Handle arrow key navigation."""
+        """Handle arrow key navigation; the arrows must not reach the app's gain/band bindings."""
+        if event.key in ("left", "right", "up", "down"):
+            event.prevent_default()
+            event.stop()
         if event.key == "left":
             self.active_panel = "level"
             self.update_display()
@@ -204,7 +283,7 @@ class LoudnessCalibrationScreen(Screen):
             self.update_display()
         elif event.key == "up":
             if self.active_panel == "level":
-                self.app.reference_level_idx = max(0, self.app.reference_level_idx - 1)
+                self.step_level(-1)
             else:
                 noise_order = ["white", "pink", "brown"]
                 idx = noise_order.index(self.noise_type)
@@ -213,7 +292,7 @@ class LoudnessCalibrationScreen(Screen):
             self.play_noise()
         elif event.key == "down":
             if self.active_panel == "level":
-                self.app.reference_level_idx = min(len(REFERENCE_LEVELS) - 1, self.app.reference_level_idx + 1)
+                self.step_level(1)
             else:
                 noise_order = ["white", "pink", "brown"]
                 idx = noise_order.index(self.noise_type)
@@ -221,6 +300,16 @@ class LoudnessCalibrationScreen(Screen):
             self.update_display()
             self.play_noise()
 
+    def selectable_levels(self):
+        """A multi-level session only switches between its own levels; calibrating never adds one."""
+        return sorted(self.app.level_results) if self.app.multi_level else list(range(len(REFERENCE_LEVELS)))
+
+    def step_level(self, step):
+        levels = self.selectable_levels()
+        pos = levels.index(self.app.reference_level_idx) + step
+        if 0 <= pos < len(levels):
+            self.app.set_reference_level(levels[pos])
+
     def update_display(self):
         """Update display with current selections."""
         # Update active column styling
@@ -235,11 +324,13 @@ class LoudnessCalibrationScreen(Screen):
             level_panel.remove_class("active_column")
         
         # Level options - display all 4 reference levels
+        selectable = self.selectable_levels()
         for i in range(4):
             marker = "> " if self.app.reference_level_idx == i else "  "
             level_info = REFERENCE_LEVELS[i]
+            note = "" if i in selectable else " - not in session"
             self.query_one(f"#level_opt{i+1}").update(
-                f"{marker}{level_info['name']} ({level_info['desc']})"
+                f"{marker}{level_info['name']} ({level_info['desc']}){note}"
             )
         
         # Noise options
@@ -252,50 +343,19 @@ class LoudnessCalibrationScreen(Screen):
         self.query_one("#noise_opt3").update(f"{noise3_marker}Brown Noise")
 
     def generate_noise(self, duration=10.0):
-        """Generate RMS-normalized broadband noise at exact target level."""
-        samples = int(SAMPLE_RATE * duration)
-        
-        # Get target RMS from reference level
-        target_rms = REFERENCE_LEVELS[self.app.reference_level_idx]["amplitude"]
-        
-        if self.noise_type == "white":
-            # White noise: generate directly with target RMS as scale parameter
-            # For zero-mean Gaussian noise: RMS = standard deviation
-            noise = np.random.normal(loc=0.0, scale=target_rms, size=samples)
-        elif self.noise_type == "pink":
-            # Pink noise: -3dB/octave using proper filtering
-            white = np.random.normal(0, 1, samples)
-            # Design pink filter using cascaded poles (Voss algorithm approximation)
-            b = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
-            a = np.array([1, -2.494956002, 2.017265875, -0.522189400])
-            noise = signal.lfilter(b, a, white)
-            # Normalize to exact target RMS
-            current_rms = np.sqrt(np.mean(noise**2))
-            if current_rms > 0:
-                noise = noise * (target_rms / current_rms)
-        else:  # brown
-            # Brown noise: -6dB/octave (integrated white noise with leak)
-            white = np.random.normal(0, 1, samples)
-            # Use leaky integrator with coefficient tuned to match reference
-            # 0.9995 balances bass energy to match reference brown noise spectrum
-            noise = signal.lfilter([1.0], [1.0, -0.9995], white)
-            # Normalize to exact target RMS
-            current_rms = np.sqrt(np.mean(noise**2))
-            if current_rms > 0:
-                noise = noise * (target_rms / current_rms)
-        
-        return noise.astype(np.float32)
+        """Generate broadband noise normalized to RMS 1; play_noise scales it to the reference level."""
+        return broadband_noise(self.noise_type, duration)
 
     def play_noise(self):
-        # Use cached noise to avoid regeneration delays
-        cache_key = (self.noise_type, self.app.reference_level_idx)
-        if cache_key not in self.noise_cache:
-            self.noise_cache[cache_key] = self.generate_noise()
-        noise_signal = self.noise_cache[cache_key]
-        self.app.audio_engine.play(noise_signal, loop=True)
+        # One cached unit-RMS render per noise type serves every reference level
+        if self.noise_type not in self.noise_cache:
+            self.noise_cache[self.noise_type] = self.generate_noise()
+        level = REFERENCE_LEVELS[self.app.reference_level_idx]
+        self.app.audio_engine.play(self.noise_cache[self.noise_type], loop=True, scale=level["amplitude"])
+        self.app.meter_target = level["dbfs"]
 
     def action_dismiss_screen(self):
-        self.app.audio_engine.clear()
+        self.app.cancel_playback()
         self.dismiss()
 
 class VerificationScreen(Screen):
@@ -315,7 +375,7 @@ class VerificationScreen(Screen):
     def __init__(self, results):
         super().__init__()
         self.results = results
-        self.freq_list = list(ISO_FREQS)
+        self.freq_list = list(self.app.freqs)
         self.v_idx = 0
         self.mode_sequence = True 
 
@@ -337,7 +397,7 @@ class VerificationScreen(Screen):
             yield Label("", id="v_freq_label")
             yield Label("", id="v_db_label", classes="mode-indicator")
             yield Label("", id="v_waveform_label", classes="mode-indicator")
-            yield ProgressBar(total=len(ISO_FREQS), id="v_pbar", show_percentage=True)
+            yield ProgressBar(total=len(self.freq_list), id="v_pbar", show_percentage=True)
             with Horizontal():
                 yield Button("Exit (Esc)", id="exit_verify")
 
@@ -360,6 +420,7 @@ class VerificationScreen(Screen):
         self.query_one("#v_db_label").update(f"Level: {db:+.1f} dB")
         self.query_one("#v_waveform_label").update(waveform_txt)
         self.query_one("#v_pbar").update(progress=self.v_idx + 1)
+        self.app.latency.mark("ui")
 
     def action_toggle_playback_mode(self):
         self.mode_sequence = not self.mode_sequence
@@ -391,12 +452,20 @@ class VerificationScreen(Screen):
         self.action_play_audio()
 
     def action_gain_up(self):
-        self.results[self.freq_list[self.v_idx]] += 0.5
+        self.app.latency.begin("verify_gain_up")
+        freq = self.freq_list[self.v_idx]
+        self.results[freq] += 0.5
+        self.app.manual_steps[freq] = self.app.manual_steps.get(freq, 0) + 1
+        self.app.record_result(freq, "verify")
         self.update_v_ui()
         self.action_play_audio()
 
     def action_gain_down(self):
-        self.results[self.freq_list[self.v_idx]] -= 0.5
+        self.app.latency.begin("verify_gain_down")
+        freq = self.freq_list[self.v_idx]
+        self.results[freq] -= 0.5
+        self.app.manual_steps[freq] = self.app.manual_steps.get(freq, 0) + 1
+        self.app.record_result(freq, "verify")
         self.update_v_ui()
         self.action_play_audio()
 
@@ -410,83 +479,681 @@ class VerificationScreen(Screen):
         db = self.results.get(freq, 0.0)
         
         if self.mode_sequence:
-            # Anchor-gap-test: short 2.0s tones for sequence
-            # Use main app's cache for both ref and test tones
-            ref_key = (1000.0, 0.0, self.app.waveform_idx, self.app.reference_level_idx, False)
-            if ref_key not in self.app.audio_cache:
-                self.app.audio_cache[ref_key] = self.app.generate_seamless_warble(1000.0, 0.0, 2.0, for_looping=False)
-            ref = self.app.audio_cache[ref_key]
-            
-            test_key = (freq, db, self.app.waveform_idx, self.app.reference_level_idx, False)
-            if test_key not in self.app.audio_cache:
-                self.app.audio_cache[test_key] = self.app.generate_seamless_warble(freq, db, 2.0, for_looping=False)
-            test_tone = self.app.audio_cache[test_key]
-            
-            silence = np.zeros(int(SAMPLE_RATE * 0.3), dtype=np.float32)
-            self.app.audio_engine.play(np.concatenate([ref, silence, test_tone]), loop=False)
+            # Anchor-gap-test: short 2.0s tones for sequence, rendered via the main app's cache
+            self.app.request_playback([self.app.tone_key(1000.0, 0.0, False), None,
+                                       self.app.tone_key(freq, db, False)], loop=False)
         else:
             # Level Adjusted Only mode: long duration for seamless looping
-            # Use main app's cache
-            cache_key = (freq, db, self.app.waveform_idx, self.app.reference_level_idx, True)
-            if cache_key not in self.app.audio_cache:
-                self.app.audio_cache[cache_key] = self.app.generate_seamless_warble(freq, db, 2.0, for_looping=True)
-            test_tone = self.app.audio_cache[cache_key]
-            self.app.audio_engine.play(test_tone, loop=True)
+            self.app.request_playback([self.app.tone_key(freq, db, True)], loop=True)
 
     def on_key(self, event):
         """Block keys that could cause issues in verification mode."""
-        if event.key in ("c", "l", "s", "t"):
+        # n/e/b would switch the level or ear under the results this screen edits
+        if event.key in ("c", "l", "s", "t", "n", "e", "b"):
             event.prevent_default()
             event.stop()
             return
         # Let other keys propagate normally
     
     def action_dismiss_screen(self):
-        self.app.audio_engine.clear()
+        self.app.cancel_playback()
         self.dismiss()
 
     def on_button_pressed(self, event):
-        self.app.audio_engine.clear()
+        self.app.cancel_playback()
         self.dismiss()
 
-class AudioEngine:
-    """Simple persistent audio stream to avoid device open/close crackling."""
+class Staircase:
+    """Adaptive 1-up/1-down staircase for one band.
+
+    Each trial is judged "test louder" or "test quieter" than the anchor,
+    so the track converges on the level of equal loudness (50% point).
+    The step halves at every reversal down to min_step; the estimate is
+    the mean of the last reversal levels.
+    """
+    def __init__(self, start_db, step=4.0, min_step=0.5, reversals=6, max_trials=24):
+        self.level = start_db
+        self.step = step
+        self.min_step = min_step
+        self.reversals = reversals
+        self.max_trials = max_trials
+        self.direction = 0
+        self.reversal_levels = []
+        self.trials = 0
+
+    @property
+    def done(self):
+        return len(self.reversal_levels) >= self.reversals or self.trials >= self.max_trials
+
+    def respond(self, test_louder: bool):
+        direction = -1 if test_louder else 1
+        self.trials += 1
+        if self.direction and direction != self.direction:
+            self.reversal_levels.append(self.level)
+            self.step = max(self.min_step, self.step / 2)
+        self.direction = direction
+        self.level += direction * self.step
+
+    def estimate(self):
+        """Returns (level, spread): mean and std of the last four reversals."""
+        levels = self.reversal_levels[-4:] or [self.level]
+        return float(np.mean(levels)), float(np.std(levels))
+
+class StaircaseScreen(Screen):
+    """Automated Phase 1: interleaved per-band staircases on anchor -> gap -> test trials."""
+    BINDINGS = [
+        Binding("escape", "dismiss_screen", "Exit"),
+        Binding("up", "respond(False)", "Test quieter"),
+        Binding("down", "respond(True)", "Test louder"),
+        Binding("space", "play_trial", "Replay"),
+        Binding("left", "ignore", "", show=False),
+        Binding("right", "ignore", "", show=False)
+    ]
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+        # The 1 kHz anchor is the reference and is not measured against itself
+        self.tracks = {
+            f: Staircase(self.results.get(f, 0.0) + random.choice([-4.0, -2.0, 0.0, 2.0, 4.0]))
+            for f in self.app.freqs if f != 1000.0
+        }
+        self.freq = None
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="verify_container"):
+            yield Label("AUTOMATIC MATCHING (STAIRCASE)", variant="title")
+            yield Static(
+                "Each trial plays the 1000Hz anchor, a short gap and a test tone.\n"
+                "1. [DOWN]: Test tone was LOUDER than the anchor.\n"
+                "2. [UP]: Test tone was QUIETER than the anchor.\n"
+                "3. [SPACE]: Replay the trial.\n"
+                "Bands are interleaved randomly; finished bands are written to the profile.",
+                classes="instr",
+                markup=False
+            )
+            yield Label("", id="s_ref_level_label", classes="mode-indicator")
+            yield Label("", id="s_trial_label")
+            yield Label("", id="s_summary_label")
+            yield ProgressBar(total=len(self.tracks), id="s_pbar", show_percentage=True)
+            with Horizontal():
+                yield Button("Exit (Esc)", id="exit_staircase")
+
+    def on_mount(self):
+        self.next_trial()
+
+    def next_trial(self):
+        pending = [f for f, track in self.tracks.items() if not track.done]
+        done = len(self.tracks) - len(pending)
+        self.query_one("#s_pbar").update(progress=done)
+        ref_level = REFERENCE_LEVELS[self.app.reference_level_idx]
+        self.query_one("#s_ref_level_label").update(f"LEVEL: {ref_level['name']} ({ref_level['desc']})")
+        if not pending:
+            self.freq = None
+            self.app.cancel_playback()
+            self.query_one("#s_trial_label").update("All bands finished.")
+            self.query_one("#s_summary_label").update(self.report())
+            self.app.debug_log.write(self.report())
+            return
+        # Interleave: avoid presenting the same band twice in a row
+        choices = [f for f in pending if f != self.freq] or pending
+        self.freq = random.choice(choices)
+        trials = sum(track.trials for track in self.tracks.values())
+        self.query_one("#s_trial_label").update(
+            f"Trial {trials + 1} | Bands finished: {done}/{len(self.tracks)}"
+        )
+        self.action_play_trial()
+
+    def action_play_trial(self):
+        if self.freq is None:
+            return
+        level = self.tracks[self.freq].level
+        self.app.request_playback([self.app.tone_key(1000.0, 0.0, False), None,
+                                   self.app.tone_key(self.freq, level, False)], loop=False)
+
+    def action_respond(self, test_louder: bool):
+        if self.freq is None:
+            return
+        track = self.tracks[self.freq]
+        track.respond(test_louder)
+        if track.done:
+            level, _ = track.estimate()
+            self.results[self.freq] = round(level, 2)
+            self.app.record_result(self.freq)
+        self.next_trial()
+
+    def report(self):
+        """Trials and repeatability of the finished bands, next to the manual adjustments made this session."""
+        finished = [t for t in self.tracks.values() if t.done]
+        if not finished:
+            return "No band finished."
+        trials = np.mean([t.trials for t in finished])
+        spread = np.mean([t.estimate()[1] for t in finished])
+        text = f"Staircase: {trials:.1f} trials/band, reversal spread {spread:.2f} dB ({len(finished)} bands)"
+        manual = [n for f, n in self.app.manual_steps.items() if f != 1000.0]
+        if manual:
+            text += f" | Manual: {np.mean(manual):.1f} adjustments/band ({len(manual)} bands)"
+        return text
+
+    def action_ignore(self):
+        pass
+
+    def on_key(self, event):
+        """Block keys that could cause issues in staircase mode."""
+        # n/e/b would switch the level or ear under the running staircases
+        if event.key in ("c", "l", "s", "t", "v", "m", "f1", "n", "e", "b"):
+            event.prevent_default()
+            event.stop()
+
+    def action_dismiss_screen(self):
+        self.app.cancel_playback()
+        self.dismiss()
+
+    def on_button_pressed(self, event):
+        self.app.cancel_playback()
+        self.dismiss()
+
+class LatencyProbe:
+    """Key-press-to-sound latency measurement.
+
+    Each action opens a measurement that collects monotonic timestamps for
+    its stages (key -> ui -> render -> play -> output). The output stamp is
+    taken by the audio callback from the stream's time_info, i.e. when the
+    first block of the new buffer is expected at the DAC. Completed
+    measurements are kept per action in a rolling window.
+    """
+    STAGES = ("ui", "render", "play", "output")
+
+    def __init__(self, window=200):
+        self.window = window
+        self.current = None
+        self.samples = {}  # action -> deque of (total, ui, render, play, output) in seconds
+
+    def begin(self, action):
+        self.current = {"action": action, "key": time.perf_counter()}
+
+    def mark(self, stage):
+        if self.current is not None:
+            self.current[stage] = time.perf_counter()
+
+    def take(self):
+        """Hand the open measurement over to the audio engine."""
+        probe, self.current = self.current, None
+        return probe
+
+    def drain(self, delivered):
+        """Collects measurements completed by the audio thread; returns the actions that got new samples."""
+        updated = set()
+        while delivered:
+            probe = delivered.popleft()
+            stamps = [probe["key"]] + [probe.get(stage) for stage in self.STAGES]
+            if None in stamps:
+                continue
+            steps = [b - a for a, b in zip(stamps, stamps[1:])]
+            window = self.samples.setdefault(probe["action"], deque(maxlen=self.window))
+            window.append((stamps[-1] - stamps[0], *steps))
+            updated.add(probe["action"])
+        return updated
+
+    def summary(self, action):
+        data = np.array(self.samples[action]) * 1000.0
+        p50, p95, p99 = np.percentile(data[:, 0], [50, 95, 99])
+        ui, render, play, output = np.median(data[:, 1:], axis=0)
+        return (f"[latency] {action}: p50 {p50:.1f} / p95 {p95:.1f} / p99 {p99:.1f} ms (n={len(data)}; "
+                f"median ui {ui:.1f}, render {render:.1f}, play {play:.1f}, output {output:.1f})")
+
+class WarbleSynth:
+    """float32 synthesis kernels with reusable scratch buffers.
+
+    Every temporary lives in scratch arrays that grow on demand and are
+    reused by later renders; the only new allocation per render is the
+    returned buffer (plus the per-chunk FFT blocks for noise).
+    Only the carrier phase is accumulated in float64, and it is wrapped to
+    [0, 1) cycles before the float32 sine.
+
+    Long noise renders are split into NOISE_CHUNK sample chunks that run on
+    a thread pool: each chunk draws from its own PCG64 stream (the render's
+    stream jumped by the chunk index) and is filtered by overlap-save, so a
+    seed gives the same noise for any number of threads.
+    """
+    NOISE_WIDTH_HZ = 200.0
+    NOISE_TAPS = 2001
+    NOISE_CHUNK = 2**17
+    CROSSFADE_SAMPLES = int(SAMPLE_RATE * 0.05)  # 50ms crossfade
+
+    def __init__(self, seed=None, threads=None):
+        self.lock = threading.Lock()
+        self.seed = np.random.SeedSequence(seed)  # Spawns one PCG64 stream per noise render
+        self.threads = threads or os.cpu_count() or 1
+        self.pool = None  # ThreadPoolExecutor for chunked noise, created on the first long render
+        self.ramp = np.empty(0, dtype=np.float64)  # 0, 1, 2, ... sample index
+        self.phase = np.empty(0, dtype=np.float64)
+        self.lfo = np.empty(0, dtype=np.float32)
+        self.noise_buf = np.empty(0, dtype=np.float32)
+        self.fade_in = np.linspace(0.0, 1.0, self.CROSSFADE_SAMPLES, dtype=np.float32)
+        self.fade_out = np.ascontiguousarray(self.fade_in[::-1])
+        self.fade_tmp = np.empty(self.CROSSFADE_SAMPLES, dtype=np.float32)
+
+    def _reserve(self, n):
+        if len(self.ramp) < n:
+            self.ramp = np.arange(n, dtype=np.float64)
+            self.phase = np.empty(n, dtype=np.float64)
+            self.lfo = np.empty(n, dtype=np.float32)
+
+    def sine(self, freq, n, rms):
+        """Warble tone (LFO_RATE / LFO_DEPTH FM) with the given RMS."""
+        with self.lock:
+            self._reserve(n)
+            ramp, phase, lfo = self.ramp[:n], self.phase[:n], self.lfo[:n]
+            # LFO term in float32: cos(2*pi*LFO_RATE*t)
+            np.multiply(ramp, 2 * np.pi * LFO_RATE / SAMPLE_RATE, out=lfo, casting='same_kind')
+            np.cos(lfo, out=lfo)
+            # Carrier phase in cycles: f*t - (f*depth / (2*pi*rate)) * cos(...), wrapped to [0, 1)
+            np.multiply(ramp, freq / SAMPLE_RATE, out=phase)
+            np.multiply(lfo, freq * LFO_DEPTH / (2 * np.pi * LFO_RATE), out=lfo)
+            np.subtract(phase, lfo, out=phase)
+            np.remainder(phase, 1.0, out=phase)
+            # Sine wave: to get RMS = rms, peak must be rms * sqrt(2)
+            out = np.empty(n, dtype=np.float32)
+            np.multiply(phase, 2 * np.pi, out=out, casting='same_kind')
+            np.sin(out, out=out)
+            out *= np.float32(rms * np.sqrt(2))
+            return out
+
+    @classmethod
+    def band(cls, freq):
+        """(low, high) cutoffs of the noise band around freq, clamped to 20 Hz .. 0.95 * Nyquist."""
+        nyquist = SAMPLE_RATE / 2
+        return max(20.0, freq - cls.NOISE_WIDTH_HZ / 2), min(nyquist * 0.95, freq + cls.NOISE_WIDTH_HZ / 2)
+
+    def _map(self, fn, count):
+        """Runs fn(0 .. count-1) on the chunk pool (inline for a single chunk or thread)."""
+        if count == 1 or self.threads == 1:
+            for i in range(count):
+                fn(i)
+            return
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(self.threads, thread_name_prefix="noise")
+        for _ in self.pool.map(fn, range(count)):
+            pass
+
+    def noise(self, freq, n, rms):
+        """200 Hz wide FIR band of white noise around freq, loop-crossfaded and normalized to rms."""
+        taps, cf, chunk = self.NOISE_TAPS, self.CROSSFADE_SAMPLES, self.NOISE_CHUNK
+        with self.lock:
+            # Filter history before the first output sample, then the render plus the crossfade tail
+            length = n + cf
+            total = length + taps - 1
+            if len(self.noise_buf) < total:
+                self.noise_buf = np.empty(total, dtype=np.float32)
+            noise = self.noise_buf[:total]
+            stream = np.random.PCG64(self.seed.spawn(1)[0])
+
+            def draw(i):
+                rng = np.random.Generator(stream.jumped(i))
+                rng.standard_normal(dtype=np.float32, out=noise[i * chunk:(i + 1) * chunk])
+
+            self._map(draw, -(-total // chunk))
+
+            # Steep FIR bandpass filter with boundary checking
+            low_cutoff, high_cutoff = self.band(freq)
+            b = signal.firwin(taps, [low_cutoff, high_cutoff], pass_zero=False, fs=SAMPLE_RATE).astype(np.float32)
+            # Overlap-save: one FFT block per chunk, with the filter spectrum shared by all chunks;
+            # chunks of equal length keep the last block from padding a short tail to a full FFT
+            blocks = -(-length // chunk)
+            step = -(-length // blocks)
+            size = fft.next_fast_len(step + taps - 1, real=True)
+            response = fft.rfft(b, size)
+            filtered = np.empty(length, dtype=np.float32)
+
+            def convolve(i):
+                # Each output chunk reads taps - 1 samples of history before it and drops the
+                # wrapped-around start of the circular convolution; equals lfilter(b, 1.0, noise)
+                # past the first taps - 1 samples
+                start, stop = i * step, min((i + 1) * step, length)
+                block = fft.rfft(noise[start:stop + taps - 1], size)
+                block *= response
+                filtered[start:stop] = fft.irfft(block, size)[taps - 1:taps - 1 + stop - start]
+
+            self._map(convolve, blocks)
+
+            # Stable region plus the continuation used for the crossfade
+            wave = filtered[:n]
+            tail = filtered[n:]
+            # Blend the continuation past the end into the start so the loop point is seamless
+            np.multiply(tail, self.fade_out, out=self.fade_tmp)
+            wave[:cf] *= self.fade_in
+            wave[:cf] += self.fade_tmp
+
+            # Normalize to exact target RMS
+            current_rms = np.sqrt(np.dot(wave, wave) / n)
+            if current_rms > 0:
+                wave *= np.float32(rms / current_rms)
+            return wave
+
+class WarbleOscillator:
+    """Live warble tone for the audio callback: same FM as WarbleSynth.sine, no buffer.
+
+    Carrier and LFO phases persist across blocks (float64 cycles, wrapped
+    once per block), so there is no loop seam. Frequency (in log space) and
+    RMS glide exponentially towards their targets with time constant GLIDE_TIME;
+    a new oscillator starts from silence. Scratch arrays are sized once for
+    the largest block seen, so render() does not allocate.
+    """
+    GLIDE_TIME = 0.01  # seconds
+
+    def __init__(self, freq, rms):
+        self.log_freq = np.log(freq)
+        self.rms = 0.0
+        self.target_log_freq = self.log_freq
+        self.target_rms = rms
+        self.phase = 0.0
+        self.lfo_phase = 0.0
+        self.coef = np.exp(-1.0 / (self.GLIDE_TIME * SAMPLE_RATE))
+        self._reserve(1024)
+
+    def _reserve(self, n):
+        self.steps = np.arange(1, n + 1, dtype=np.float64)
+        self.decay = self.coef ** self.steps  # coef^1 ... coef^n
+        self.work = np.empty(n, dtype=np.float64)
+        self.inc = np.empty(n, dtype=np.float64)
+
+    def set_target(self, freq, rms):
+        self.target_log_freq = np.log(freq)
+        self.target_rms = rms
+
+    def render(self, out):
+        """Fill out (float32, one sample per frame) with the next block."""
+        n = len(out)
+        if len(self.steps) < n:
+            self._reserve(n)
+        decay, work, inc = self.decay[:n], self.work[:n], self.inc[:n]
+        # Instantaneous frequency: glided carrier * (1 + depth * sin(2*pi*lfo_phase))
+        np.multiply(self.steps[:n], LFO_RATE / SAMPLE_RATE, out=work)
+        work += self.lfo_phase
+        work *= 2 * np.pi
+        np.sin(work, out=work)
+        work *= LFO_DEPTH
+        work += 1.0
+        np.multiply(decay, self.log_freq - self.target_log_freq, out=inc)
+        inc += self.target_log_freq
+        np.exp(inc, out=inc)
+        inc *= work
+        inc *= 1.0 / SAMPLE_RATE
+        # Carrier phase in cycles, continued from the previous block
+        np.cumsum(inc, out=inc)
+        inc += self.phase
+        self.phase = inc[-1] % 1.0
+        self.lfo_phase = (self.lfo_phase + n * LFO_RATE / SAMPLE_RATE) % 1.0
+        self.log_freq = self.target_log_freq + (self.log_freq - self.target_log_freq) * decay[-1]
+        inc *= 2 * np.pi
+        np.sin(inc, out=inc)
+        # Peak = sqrt(2) * RMS for a sine
+        np.multiply(decay, (self.rms - self.target_rms) * np.sqrt(2), out=work)
+        work += self.target_rms * np.sqrt(2)
+        self.rms = self.target_rms + (self.rms - self.target_rms) * decay[-1]
+        np.multiply(inc, work, out=out, casting='same_kind')
+
+_PROCESS_SYNTH = None  # WarbleSynth of a render process, created on its first request
+
+def _process_synth(threads):
+    global _PROCESS_SYNTH
+    if _PROCESS_SYNTH is None:
+        _PROCESS_SYNTH = WarbleSynth(threads=threads)
+    return _PROCESS_SYNTH
+
+def _warm_up(threads):
+    _process_synth(threads)
+
+def _render_shared(name, waveform, freq, n, threads):
+    """Render process entry point: unit-RMS tone written into the shared block name."""
+    synth = _process_synth(threads)
+    render = synth.noise if waveform == "noise" else synth.sine
+    # Spawned workers share the parent's resource tracker, which unlinks leftovers at exit
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        np.ndarray((n,), dtype=np.float32, buffer=shm.buf)[:] = render(freq, n, 1.0)
+    finally:
+        shm.close()
+
+class RenderProcess:
+    """Tone synthesis in worker processes, handed back through shared memory.
+
+    Synthesis runs outside this interpreter, so long NumPy/SciPy renders
+    never hold the GIL the UI and the audio callback need, and concurrent
+    renders use several cores. This process allocates one shared block per
+    render and unlinks it once the worker has filled it; the returned
+    array is a zero-copy view and the mapping is closed after the last
+    reference to it is gone.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        # Noise chunk threads per process: the processes share the cores instead of each using all of them
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.pool = None
+        self.lock = threading.Lock()
+        self.blocks = []  # (weakref to returned view, SharedMemory) until the view is gone
+
+    def start(self):
+        if self.pool is None:
+            # spawn: forking a process that runs the UI and audio threads is unsafe
+            self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            # Start the workers now rather than on the first key press
+            for _ in range(self.workers):
+                self.pool.submit(_warm_up, self.threads)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def submit(self, waveform, freq, n):
+        """Queue a render; returns a function that waits for it and returns the samples."""
+        self.start()
+        shm = shared_memory.SharedMemory(create=True, size=n * np.dtype(np.float32).itemsize)
+        future = self.pool.submit(_render_shared, shm.name, waveform, freq, n, self.threads)
+
+        def result():
+            try:
+                future.result()
+            except BaseException:
+                shm.close()
+                raise
+            finally:
+                shm.unlink()
+            audio = np.ndarray((n,), dtype=np.float32, buffer=shm.buf)
+            with self.lock:
+                # Close blocks whose views have been released since the last render
+                alive = []
+                for ref, block in self.blocks:
+                    if ref() is None:
+                        block.close()
+                    else:
+                        alive.append((ref, block))
+                self.blocks = alive + [(weakref.ref(audio), shm)]
+            return audio
+        return result
+
+class ToneCache:
+    """Thread-safe LRU cache of unit-gain tone renders, bounded by total size.
+
+    Gain is applied at playback time, so one render per band serves every
+    level step and the cache grows with the grid, not with adjustments.
+    """
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def get(self, key):
+        with self.lock:
+            audio = self.items.get(key)
+            if audio is not None:
+                self.items.move_to_end(key)
+            return audio
+
+    def put(self, key, audio):
+        with self.lock:
+            if key in self.items:
+                self.nbytes -= self.items.pop(key).nbytes
+            self.items[key] = audio
+            self.nbytes += audio.nbytes
+            while self.nbytes > self.max_bytes and len(self.items) > 1:
+                _, evicted = self.items.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+def k_weighting_sos(fs):
+    """BS.1770 K-weighting (pre-filter shelf + RLB high-pass) as second-order sections for rate fs."""
+    # High shelf, bilinear design that reproduces the 48 kHz coefficients of the standard
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = np.tan(np.pi * f0 / fs)
+    vh = 10 ** (gain_db / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0,
+             1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0]
+    # RLB high-pass
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = np.tan(np.pi * f0 / fs)
+    a0 = 1.0 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+class OutputMeter:
+    """Level meter on the blocks the engine hands to the device.
+
+    capture() runs in the audio callback and only copies the block into a
+    ring buffer; every NumPy/SciPy call there would hand the GIL back and
+    forth with the UI thread. poll() runs on the UI thread: it feeds the
+    samples captured since the last poll through the K-weighting filters
+    (state carried across polls) and keeps per-chunk sums, from which it
+    reports RMS, peak and loudness over the last WINDOW seconds (the EBU
+    short-term window).
+    """
+    WINDOW = 3.0
+
     def __init__(self):
+        self.sos = k_weighting_sos(SAMPLE_RATE)
+        self.zi = np.zeros((len(self.sos), 2))
+        self.ring = np.zeros(int((self.WINDOW + 2) * SAMPLE_RATE), dtype=np.float32)
+        self.written = 0  # Samples captured so far (callback thread)
+        self.read = 0  # Samples analyzed so far (polling thread)
+        self.window_frames = int(self.WINDOW * SAMPLE_RATE)
+        self.chunks = deque()  # (frames, sum of squares, K-weighted sum of squares, peak)
+        self.frames = 0
+
+    def capture(self, block):
+        n = len(block)
+        start = self.written % len(self.ring)
+        head = min(n, len(self.ring) - start)
+        self.ring[start:start + head] = block[:head]
+        if head < n:
+            self.ring[:n - head] = block[head:]
+        self.written += n
+
+    def poll(self):
+        """Analyze newly captured samples; (rms dBFS, peak dBFS, short-term LUFS), -inf for silence."""
+        written = self.written
+        # Keep a second of headroom so the callback never overwrites what is being read
+        new = min(written - self.read, len(self.ring) - SAMPLE_RATE)
+        self.read = written
+        if new > 0:
+            block = self.ring[np.arange(written - new, written) % len(self.ring)]
+            weighted, self.zi = signal.sosfilt(self.sos, block, zi=self.zi)
+            self.chunks.append((new, float(np.dot(block, block)),
+                                float(np.dot(weighted, weighted)), float(np.abs(block).max())))
+            self.frames += new
+            while self.frames - self.chunks[0][0] >= self.window_frames:
+                self.frames -= self.chunks.popleft()[0]
+        if not self.chunks:
+            return -np.inf, -np.inf, -np.inf
+        frames, sum_sq, sum_k, peak = np.array(self.chunks).T
+        with np.errstate(divide='ignore'):
+            rms = 10 * np.log10(sum_sq.sum() / frames.sum())
+            lufs = -0.691 + 10 * np.log10(sum_k.sum() / frames.sum())
+            peak = 20 * np.log10(peak.max())
+        return float(rms), float(peak), float(lufs)
+
+class AudioEngine:
+    """Simple persistent audio stream to avoid device open/close crackling.
+
+    Sources are mono; with channels=2 a route vector sets the gain of the
+    source on each channel, applied in the same multiply as the level.
+    """
+    def __init__(self, channels=1):
         self.stream = None
+        self.channels = channels
         self.current_audio = np.array([], dtype=np.float32)
         self.position = 0
         self.is_looping = False
+        self.scale = np.float32(1.0)
+        self.route = np.ones(channels, dtype=np.float32)  # Per-channel gain of the mono source
+        self.gains = self.route * self.scale  # Applied while copying current_audio to the device
+        self.meter_channel = 0  # Loudest routed channel, the one the meter follows
+        self.mono = np.empty(0, dtype=np.float32)  # Oscillator block before routing
+        self.oscillator = None  # WarbleOscillator: replaces the buffer while set
         self.lock = threading.Lock()
+        self.pending_probe = None  # Latency measurement waiting for its first output block
+        self.delivered = deque()  # Completed latency measurements, drained by the UI
+        self.meter = OutputMeter()
     
     def callback(self, outdata, frames, time_info, status):
         with self.lock:
-            if len(self.current_audio) == 0:
-                outdata.fill(0)
-                return
-            
-            # Get samples from current position
-            remaining = len(self.current_audio) - self.position
-            if remaining >= frames:
-                # Simple case: enough samples available
-                outdata[:] = self.current_audio[self.position:self.position + frames].reshape(-1, 1)
-                self.position += frames
-            elif self.is_looping:
-                # Loop case: wrap around
-                outdata[:remaining] = self.current_audio[self.position:].reshape(-1, 1)
-                self.position = frames - remaining
-                outdata[remaining:] = self.current_audio[:self.position].reshape(-1, 1)
-            else:
-                # End of non-looping audio
-                outdata[:remaining] = self.current_audio[self.position:].reshape(-1, 1)
-                outdata[remaining:].fill(0)
-                self.position = len(self.current_audio)
+            if self.pending_probe is not None:
+                # Stream clock offset from now until this block reaches the DAC
+                dac_delay = max(0.0, time_info.outputBufferDacTime - time_info.currentTime)
+                self.pending_probe["output"] = time.perf_counter() + dac_delay
+                self.delivered.append(self.pending_probe)
+                self.pending_probe = None
+
+            self._fill(outdata, frames)
+            self.meter.capture(outdata[:, self.meter_channel])
+
+    def _fill(self, outdata, frames):
+        if self.oscillator is not None:
+            if len(self.mono) < frames:
+                self.mono = np.empty(frames, dtype=np.float32)
+            mono = self.mono[:frames]
+            self.oscillator.render(mono)
+            np.multiply(mono[:, None], self.route, out=outdata)
+            return
+
+        if len(self.current_audio) == 0:
+            outdata.fill(0)
+            return
+        
+        # Get samples from current position; level and routing are one broadcast multiply
+        audio, gains = self.current_audio, self.gains
+        remaining = len(audio) - self.position
+        if remaining >= frames:
+            # Simple case: enough samples available
+            np.multiply(audio[self.position:self.position + frames, None], gains, out=outdata)
+            self.position += frames
+        elif self.is_looping:
+            # Loop case: wrap around
+            np.multiply(audio[self.position:, None], gains, out=outdata[:remaining])
+            self.position = frames - remaining
+            np.multiply(audio[:self.position, None], gains, out=outdata[remaining:])
+        else:
+            # End of non-looping audio
+            np.multiply(audio[self.position:, None], gains, out=outdata[:remaining])
+            outdata[remaining:].fill(0)
+            self.position = len(audio)
     
     def start(self):
         """Open audio stream."""
         if self.stream is None:
+            # Imported here so the app can be driven with another engine where PortAudio is unavailable
+            import sounddevice as sd
             self.stream = sd.OutputStream(
                 samplerate=SAMPLE_RATE,
-                channels=1,
+                channels=self.channels,
                 callback=self.callback,
                 dtype=np.float32
             )
@@ -499,20 +1166,166 @@ class AudioEngine:
             self.stream.close()
             self.stream = None
     
-    def play(self, audio_data, loop=False):
-        """Load new audio into buffer."""
+    def play(self, audio_data, loop=False, probe=None, scale=1.0):
+        """Load new audio into buffer; float32 input is played in place (scale applied per block)."""
         with self.lock:
-            self.current_audio = audio_data.astype(np.float32)
+            self.current_audio = np.asarray(audio_data, dtype=np.float32)
+            self.scale = np.float32(scale)
+            self.gains = self.route * self.scale
             self.position = 0
             self.is_looping = loop
+            self.oscillator = None
+            if probe is not None:
+                probe["play"] = time.perf_counter()
+            self.pending_probe = probe
+
+    def play_tone(self, freq, rms, probe=None):
+        """Play a live warble tone; if one is already playing it glides to freq/rms."""
+        with self.lock:
+            if self.oscillator is None:
+                self.oscillator = WarbleOscillator(freq, rms)
+                self.current_audio = np.array([], dtype=np.float32)
+                self.position = 0
+            else:
+                self.oscillator.set_target(freq, rms)
+            if probe is not None:
+                probe["play"] = time.perf_counter()
+            self.pending_probe = probe
     
+    def set_route(self, route):
+        """Per-channel gains of the mono source, one per channel, e.g. (1, 0) = left only."""
+        with self.lock:
+            self.route = np.asarray(route, dtype=np.float32)
+            self.gains = self.route * self.scale
+            self.meter_channel = int(np.argmax(self.route))
+
+    def meter_reading(self):
+        """Output level over the meter window: (rms dBFS, peak dBFS, short-term LUFS).
+
+        Call from one thread only (the UI); it does the meter's analysis.
+        """
+        return self.meter.poll()
+
     def clear(self):
         """Clear audio buffer."""
         with self.lock:
+            self.oscillator = None
             self.current_audio = np.array([], dtype=np.float32)
             self.position = 0
             self.is_looping = False
 
+class SessionJournal:
+    """Append-only JSON-lines log of session changes.
+
+    Records are buffered in memory and written in batches by a background
+    thread, so the UI never waits on the disk. A session is clean when no
+    result change follows its last "saved" record; otherwise it can be
+    replayed after a crash.
+    """
+    def __init__(self, path=JOURNAL_FILE, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def close(self):
+        """Stop the writer thread and flush what is left."""
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def record(self, event, **fields):
+        line = json.dumps({"e": event, **fields}, separators=(",", ":"))
+        with self.lock:
+            self.pending.append(line)
+
+    def _run(self):
+        while self.running:
+            self.wake.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                lines, self.pending = self.pending, []
+            if not lines:
+                return
+            with open(self.path, 'a') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def reset(self, snapshot):
+        """Start a fresh journal whose first record is a snapshot of the session."""
+        with self.write_lock:
+            with self.lock:
+                self.pending = []
+            with open(self.path, 'w') as f:
+                f.write(json.dumps({"e": "snap", **snapshot}, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def read(path=JOURNAL_FILE):
+        """Returns the records of an existing journal; a torn last line is ignored."""
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+        return records
+
+    @staticmethod
+    def unsaved_changes(records):
+        """Number of set/verify records after the last save."""
+        saved = max((i for i, r in enumerate(records) if r["e"] == "saved"), default=-1)
+        return sum(r["e"] in ("set", "verify") for r in records[saved + 1:])
+
+    @staticmethod
+    def needs_recovery(records):
+        return SessionJournal.unsaved_changes(records) > 0
+
+    @staticmethod
+    def replay(records, ear_results):
+        """Applies records to ear_results ({ear: {level_idx: {freq: db}}}) in place.
+
+        Both-ears sessions journal without ear fields and replay into "both".
+        Returns (level_idx, band_idx, ear) of the last snapshot/change; any may be None.
+        """
+        level_idx = current_idx = ear = None
+        for r in records:
+            if r["e"] == "snap":
+                ear_results.clear()
+                for snap_ear, levels in r.get("se", {"both": r.get("s", [])}).items():
+                    ear_results[snap_ear] = {lvl: {float(f): db for f, db in rows} for lvl, rows in levels}
+                level_idx = r["lv"]
+                current_idx = r.get("i", current_idx)
+                ear = r.get("ear", ear)
+            elif r["e"] in ("set", "verify"):
+                ear_results.setdefault(r.get("ear", "both"), {}).setdefault(r["l"], {})[float(r["f"])] = r["db"]
+            elif r["e"] == "band":
+                current_idx = r["i"]
+            elif r["e"] == "level":
+                level_idx = r["lv"]
+            elif r["e"] == "ear":
+                ear = r["ear"]
+        return level_idx, current_idx, ear
+
 class HearCal(App):
     BINDINGS = [
         Binding("s", "request_save", "Save"), 
@@ -520,7 +1333,11 @@ class HearCal(App):
         Binding("t", "toggle_tone", "Toggle"), 
         Binding("space", "play_stop", "Play/Stop"),
         Binding("v", "enter_verify", "Verify"), 
+        Binding("m", "enter_staircase", "Auto Match"),
         Binding("c", "enter_calibration", "Calibrate"),
+        Binding("n", "next_level", "Next Level"),
+        Binding("e", "switch_ear", "Ear"),
+        Binding("b", "balance_check", "Balance"),
         Binding("left", "prev_freq", "Prev"),
         Binding("right", "next_freq", "Next"), 
         Binding("up", "gain_up", "+0.5dB"),
@@ -577,6 +1394,7 @@ class HearCal(App):
         text-style: italic; color: $text-muted; 
         margin-bottom: 1; height: auto; 
     }
+    #meter_label { width: 100%; text-align: center; color: $text-muted; }
     #debug_terminal { 
         height: 8; border: solid $error; 
         background: black; color: #00FF00; margin-top: 1; 
@@ -595,17 +1413,44 @@ class HearCal(App):
     Button { margin: 0 1; }
     """
 
-    def __init__(self):
+    def __init__(self, grid_fraction=3, session_levels=None, audio_engine=None, render_workers=0,
+                 per_ear=False):
         super().__init__()
         self.active_mode = "REF"
         self.current_idx = 0 
-        self.results = {float(f): 0.0 for f in ISO_FREQS}
+        self.freqs = frequency_grid(grid_fraction)
+        # Results are ear -> level -> freq -> dB. Multi-level sessions keep one
+        # dict per reference level, per-ear sessions one set of levels per ear
+        # ("both" otherwise); level_results and results point at the active ones
+        self.multi_level = bool(session_levels) and len(session_levels) > 1
+        levels = session_levels or [0]
+        self.per_ear = per_ear
+        self.ears = list(EAR_ROUTES) if per_ear else ["both"]
+        self.ear = self.ears[0]
+        self.ear_results = {ear: {idx: {float(f): 0.0 for f in self.freqs} for idx in levels} for ear in self.ears}
+        self.level_results = self.ear_results[self.ear]
         self.is_playing = False
-        self.audio_engine = AudioEngine()
+        self.audio_engine = audio_engine or AudioEngine(channels=2 if per_ear else 1)
+        if per_ear:
+            self.audio_engine.set_route(EAR_ROUTES[self.ear])
         self.waveform_types = ["sine", "noise"]
         self.waveform_idx = 0
-        self.reference_level_idx = 0  # Default to -18 dBFS (EBU R128)
-        self.audio_cache = {}  # Cache: (freq, gain, waveform_idx, ref_level_idx) -> samples
+        self.reference_level_idx = levels[0]  # Default to -18 dBFS (EBU R128)
+        self.results = self.level_results[self.reference_level_idx]
+        self.synth = WarbleSynth()
+        # Synthesis processes (None: one per spare core); 0, the default, renders in this process
+        self.render_process = None if render_workers == 0 else RenderProcess(render_workers)
+        if self.render_process is not None:
+            # Now, while sys.stderr is still the real one: the resource tracker spawned with the pool inherits it
+            self.render_process.start()
+        self.audio_cache = ToneCache()  # (freq, waveform_idx, for_looping) -> unit-RMS samples
+        self.render_generation = 0  # Bumped per playback request; older renders are discarded
+        self.render_lock = threading.Lock()
+        self.profile = None  # ear -> full-resolution (freqs, values) of the last loaded profile
+        self.journal = SessionJournal()
+        self.latency = LatencyProbe()
+        self.manual_steps = {}  # freq -> manual gain adjustments this session
+        self.meter_target = None  # Expected output RMS in dBFS of the current playback, if steady
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -613,7 +1458,7 @@ class HearCal(App):
             yield Label("HEARCAL: PERCEPTUAL CALIBRATION", variant="title")
             yield Static(
                 "1. SPL: Set hardware volume to target level.\n"
-                "2. MATCH: Toggle [T] for equal loudness.\n"
+                "2. MATCH: Toggle [T] for equal loudness ([M]: automatic staircase).\n"
                 "3. VERIFY: Press [V] for randomized or sequential passes.", 
                 classes="instr", 
                 markup=False
@@ -623,121 +1468,191 @@ class HearCal(App):
             yield Label(id="freq_label")
             yield Static(id="db_display")
             yield Label("", id="waveform_label", classes="mode-indicator")
+            yield Label("", id="meter_label")
             with Horizontal():
                 yield Button("AUDIO (Space)", variant="success", id="play_btn")
                 yield Button("TOGGLE (T)", variant="primary", id="toggle_btn")
-            yield ProgressBar(total=len(ISO_FREQS), id="pbar", show_percentage=True)
+            yield ProgressBar(total=len(self.freqs), id="pbar", show_percentage=True)
             yield RichLog(id="debug_terminal", highlight=True, markup=True)
         yield Footer()
 
     def update_ui(self):
-        freq = ISO_FREQS[self.current_idx]
+        freq = self.freqs[self.current_idx]
         db = self.results.get(freq, 0.0)
         mode_txt = "MODE: REFERENCE" if self.active_mode == "REF" else f"MODE: TESTING ({int(freq)}Hz)"
         waveform_txt = f"WAVEFORM: {self.waveform_types[self.waveform_idx].upper()}"
         ref_level = REFERENCE_LEVELS[self.reference_level_idx]
         ref_level_txt = f"LEVEL: {ref_level['name']} ({ref_level['desc']})"
+        if self.multi_level:
+            session_levels = sorted(self.level_results)
+            ref_level_txt += f" [{session_levels.index(self.reference_level_idx) + 1}/{len(session_levels)}]"
+        if self.per_ear:
+            ref_level_txt += f" | EAR: {self.ear.upper()}"
         
         self.query_one("#mode_label").update(mode_txt)
         self.query_one("#ref_level_label").update(ref_level_txt)
         self.query_one("#freq_label").update(
-            f"Band {self.current_idx + 1}/{len(ISO_FREQS)}: [b]{int(freq)} Hz[/b]"
+            f"Band {self.current_idx + 1}/{len(self.freqs)}: [b]{int(freq)} Hz[/b]"
         )
         self.query_one("#db_display").update(f"{db:+.1f} dB")
         self.query_one("#waveform_label").update(waveform_txt)
         self.query_one("#pbar").update(progress=self.current_idx + 1)
+        self.latency.mark("ui")
         
         if self.is_playing:
             self.run_audio()
+        else:
+            self.latency.take()  # Nothing to hear: drop the measurement
 
-    def generate_seamless_warble(self, freq, gain_db, target_duration=2.0, for_looping=False):
-        # For noise in looping mode, use much longer duration to minimize loop clicks
-        waveform_type = self.waveform_types[self.waveform_idx]
-        if waveform_type == "noise" and for_looping:
-            target_duration = 15.0  # 15 seconds for looping noise
-        
-        lfo_samples = SAMPLE_RATE / LFO_RATE
-        total_samples = int(max(1, round(target_duration * LFO_RATE)) * lfo_samples)
-        t = np.linspace(0, total_samples / SAMPLE_RATE, total_samples, endpoint=False)
-        phase = 2 * np.pi * (freq * t - (freq * LFO_DEPTH / (2 * np.pi * LFO_RATE)) * np.cos(2 * np.pi * LFO_RATE * t))
+    def generate_seamless_warble(self, freq, gain_db, target_duration=2.0, for_looping=False,
+                                 waveform_idx=None, level_idx=None, rms=None):
+        # Render workers pass the waveform/level captured at request time
+        waveform_idx = self.waveform_idx if waveform_idx is None else waveform_idx
+        level_idx = self.reference_level_idx if level_idx is None else level_idx
+        waveform_type = self.waveform_types[waveform_idx]
+        total_samples = self.render_length(waveform_type, for_looping, target_duration)
         
         # Generate waveform based on current type
-        target_rms = REFERENCE_LEVELS[self.reference_level_idx]["amplitude"]
+        target_rms = REFERENCE_LEVELS[level_idx]["amplitude"] if rms is None else rms
         gain_linear = 10**(gain_db / 20.0)
+        final_rms = target_rms * gain_linear
         
-        if waveform_type == "sine":
-            # Sine wave: to get RMS = target_rms * gain, peak must be target_rms * gain * sqrt(2)
-            wave = np.sin(phase)
-            final_rms = target_rms * gain_linear
-            final_wave = wave * final_rms * np.sqrt(2)
-        elif waveform_type == "noise":
-            # Generate bandpassed white noise with crossfade for seamless looping
-            width_hz = 200.0
-            taps = 2001
-            transient_samples = taps
-            crossfade_samples = int(SAMPLE_RATE * 0.05)  # 50ms crossfade
-            
-            # Generate extra samples for transients and crossfade
-            noise = np.random.normal(0, 1, total_samples + 2 * transient_samples + crossfade_samples)
-            
-            # Steep FIR bandpass filter with boundary checking
-            nyquist = SAMPLE_RATE / 2
-            low_cutoff = max(20.0, freq - width_hz/2)
-            high_cutoff = min(nyquist * 0.95, freq + width_hz/2)
-            b = signal.firwin(taps, [low_cutoff, high_cutoff], 
-                            pass_zero=False, fs=SAMPLE_RATE)
-            filtered = signal.lfilter(b, 1.0, noise)
-            
-            # Extract stable region
-            wave = filtered[transient_samples:transient_samples + total_samples + crossfade_samples]
-            
-            # Apply crossfade at loop boundary
-            fade_out = np.linspace(1.0, 0.0, crossfade_samples)
-            fade_in = np.linspace(0.0, 1.0, crossfade_samples)
-            
-            # Crossfade end with beginning
-            wave[-crossfade_samples:] = (wave[-crossfade_samples:] * fade_out + 
-                                          wave[:crossfade_samples] * fade_in)
-            
-            # Trim to final length
-            wave = wave[:total_samples]
-            
-            # Normalize to exact target RMS
-            current_rms = np.sqrt(np.mean(wave**2))
-            final_rms = target_rms * gain_linear
-            if current_rms > 0:
-                final_wave = wave * (final_rms / current_rms)
-            else:
-                final_wave = wave
-        else:
-            wave = np.sin(phase)
-            final_rms = target_rms * gain_linear
-            final_wave = wave * final_rms * np.sqrt(2)
-        
-        return final_wave.astype(np.float32)
+        if waveform_type == "noise":
+            return self.synth.noise(freq, total_samples, final_rms)
+        return self.synth.sine(freq, total_samples, final_rms)
+
+    @staticmethod
+    def render_length(waveform_type, for_looping, target_duration=2.0):
+        """Samples in a render: whole LFO cycles, 15 s for looping noise to minimize loop clicks."""
+        if waveform_type == "noise" and for_looping:
+            target_duration = 15.0
+        lfo_samples = SAMPLE_RATE / LFO_RATE
+        return int(max(1, round(target_duration * LFO_RATE)) * lfo_samples)
 
     def action_play_stop(self):
         self.is_playing = not self.is_playing
         if not self.is_playing:
-            self.audio_engine.clear()
+            self.cancel_playback()
         else:
             self.run_audio()
         self.query_one("#play_btn").label = "STOP" if self.is_playing else "START"
 
+    def tone_key(self, freq, gain, for_looping):
+        return (freq, gain, self.waveform_idx, self.reference_level_idx, for_looping)
+
+    @staticmethod
+    def _unit_key(key):
+        """Cache key of the unit-RMS render behind a tone key (shared by all gains and levels)."""
+        freq, _, waveform_idx, _, for_looping = key
+        return (freq, waveform_idx, for_looping)
+
+    @staticmethod
+    def _tone_scale(key):
+        """Linear factor that brings a unit-RMS render to the key's level and gain."""
+        _, gain, _, level_idx, _ = key
+        return np.float32(REFERENCE_LEVELS[level_idx]["amplitude"] * 10 ** (gain / 20.0))
+
+    def _collect(self, keys):
+        """Cached unit renders for keys (None for gaps); None if any is missing."""
+        units = [None if key is None else self.audio_cache.get(self._unit_key(key)) for key in keys]
+        if any(key is not None and unit is None for key, unit in zip(keys, units)):
+            return None
+        return units
+
+    def request_playback(self, keys, loop):
+        """Play the tones for keys back to back (None = 0.3s gap).
+
+        Missing tones are rendered in a worker thread while the current
+        buffer keeps playing. Every request gets a new generation id and
+        only the newest one is played, so key repeat never queues renders.
+        A single looping sine is not rendered at all: the engine's live
+        oscillator glides to it.
+        """
+        self.render_generation += 1
+        probe = self.latency.take()
+        steady = loop and len(keys) == 1
+        self.meter_target = 20 * np.log10(self._tone_scale(keys[0])) if steady else None
+        if steady and self.waveform_types[keys[0][2]] == "sine":
+            if probe is not None:
+                probe["render"] = time.perf_counter()
+            self.audio_engine.play_tone(keys[0][0], float(self._tone_scale(keys[0])), probe=probe)
+            return
+        units = self._collect(keys)
+        if units is not None:
+            self._play_rendered(self.render_generation, keys, units, loop, probe)
+        else:
+            self._render_worker(self.render_generation, keys, loop, probe)
+
+    def cancel_playback(self):
+        """Stop output and discard any render still in flight."""
+        self.render_generation += 1
+        self.meter_target = None
+        self.audio_engine.clear()
+
+    @work(thread=True, group="render")
+    def _render_worker(self, generation, keys, loop, probe):
+        # One render at a time; requests superseded while waiting are dropped
+        with self.render_lock:
+            rendered = {}
+            missing = deque()
+            for key in keys:
+                unit_key = None if key is None else self._unit_key(key)
+                if unit_key is None or unit_key in rendered:
+                    continue
+                rendered[unit_key] = self.audio_cache.get(unit_key)
+                if rendered[unit_key] is None:
+                    missing.append(unit_key)
+            # Up to one render per process is in flight, so the missing tones render in parallel, and
+            # the generation is checked before each submission: a superseded request queues nothing more
+            slots = 1 if self.render_process is None else self.render_process.workers
+            in_flight = deque()
+            while missing or in_flight:
+                while missing and len(in_flight) < slots and generation == self.render_generation:
+                    unit_key = missing.popleft()
+                    freq, waveform_idx, for_looping = unit_key
+                    if self.render_process is None:
+                        audio = self.generate_seamless_warble(
+                            freq, 0.0, for_looping=for_looping, waveform_idx=waveform_idx, rms=1.0)
+                        in_flight.append((unit_key, lambda audio=audio: audio))
+                    else:
+                        waveform_type = self.waveform_types[waveform_idx]
+                        in_flight.append((unit_key, self.render_process.submit(
+                            waveform_type, freq, self.render_length(waveform_type, for_looping))))
+                if not in_flight:
+                    return
+                # Renders already submitted are finished and cached even if the request was superseded
+                unit_key, result = in_flight.popleft()
+                rendered[unit_key] = result()
+                self.audio_cache.put(unit_key, rendered[unit_key])
+            if generation != self.render_generation:
+                return
+            units = [None if key is None else rendered[self._unit_key(key)] for key in keys]
+        self.call_from_thread(self._play_rendered, generation, keys, units, loop, probe)
+
+    def _play_rendered(self, generation, keys, units, loop, probe):
+        if generation != self.render_generation:
+            return
+        if probe is not None:
+            probe["render"] = time.perf_counter()
+        if len(keys) == 1:
+            # The cached render itself is played, the engine applies the gain
+            self.audio_engine.play(units[0], loop=loop, probe=probe, scale=self._tone_scale(keys[0]))
+            return
+        audio = np.concatenate([np.zeros(int(SAMPLE_RATE * 0.3), dtype=np.float32) if key is None
+                                else unit * self._tone_scale(key) for key, unit in zip(keys, units)])
+        self.audio_engine.play(audio, loop=loop, probe=probe)
+
     def run_audio(self):
         if not self.is_playing:
             return
-        freq = 1000.0 if self.active_mode == "REF" else ISO_FREQS[self.current_idx]
+        freq = 1000.0 if self.active_mode == "REF" else self.freqs[self.current_idx]
         gain = 0.0 if self.active_mode == "REF" else self.results.get(freq, 0.0)
         
         # Use cached audio to avoid regeneration delays (especially for 15s noise)
-        cache_key = (freq, gain, self.waveform_idx, self.reference_level_idx)
-        if cache_key not in self.audio_cache:
-            self.audio_cache[cache_key] = self.generate_seamless_warble(freq, gain, for_looping=True)
-        
-        self.audio_engine.play(self.audio_cache[cache_key], loop=True)
+        self.request_playback([self.tone_key(freq, gain, True)], loop=True)
 
     def action_toggle_tone(self):
+        self.latency.begin("toggle")
         self.active_mode = "TEST" if self.active_mode == "REF" else "REF"
         self.update_ui()
 
@@ -750,6 +1665,11 @@ class HearCal(App):
             self.action_play_stop()
         self.push_screen(VerificationScreen(self.results), callback=self._on_verify_return)
     
+    def action_enter_staircase(self):
+        if self.is_playing:
+            self.action_play_stop()
+        self.push_screen(StaircaseScreen(self.results), callback=self._on_verify_return)
+
     def action_enter_calibration(self):
         if self.is_playing:
             self.action_play_stop()
@@ -763,26 +1683,36 @@ class HearCal(App):
         fn = message.filename
         if message.mode == "load":
             try:
-                # Clear and reset all results to 0.0 before loading (preserves dict reference)
-                self.results.clear()
-                for f in ISO_FREQS:
-                    self.results[float(f)] = 0.0
-                
-                with open(fn, 'r') as f:
-                    for row in csv.DictReader(f):
-                        f_in = float(row['frequency'])
-                        db_in = float(row['raw'])
-                        std_f = min(ISO_FREQS, key=lambda x: abs(x - f_in))
-                        self.results[std_f] = db_in
+                if fn.endswith(".npz"):
+                    self.load_surface(fn)
+                else:
+                    # Per-ear files carry left/right columns; "raw" (their mean) serves the rest
+                    columns = csv_columns(fn)
+                    self.profile = {ear: load_profile(fn, ear if ear in columns else "raw") for ear in self.ears}
+                    for ear, (freqs, values) in self.profile.items():
+                        self.apply_profile(freqs, values, self.ear_results[ear][self.reference_level_idx])
+                self.journal.record("snap", **self.snapshot())
                 self.update_ui()
             except: 
                 pass
         else:
-            with open(fn, 'w', newline='') as f:
-                w = csv.writer(f)
-                w.writerow(["frequency", "raw"])
-                for freq in sorted(ISO_FREQS): 
-                    w.writerow([f"{freq:.2f}", f"{self.results[freq]:.2f}"])
+            # Per-ear sessions save both ears plus their mean as "raw" in one file
+            if fn.endswith(".npz"):
+                surfaces = {ear: self.surface(ear) for ear in self.ears}
+                levels, freqs, _ = surfaces[self.ear]
+                raws = {ear: raw for ear, (_, _, raw) in surfaces.items()}
+                save_surface(fn, levels, freqs, np.mean(list(raws.values()), axis=0),
+                             ears=raws if self.per_ear else None)
+            else:
+                profiles = {ear: self.export_profile(ear) for ear in self.ears}
+                freqs = profiles[self.ear][0]
+                columns = np.array([values for _, values in profiles.values()])
+                with open(fn, 'w', newline='') as f:
+                    w = csv.writer(f)
+                    w.writerow(["frequency", "raw"] + (self.ears if self.per_ear else []))
+                    for freq, db, ear_dbs in zip(freqs, columns.mean(axis=0), columns.T):
+                        w.writerow([f"{freq:.2f}", f"{db:.2f}"] + ([f"{v:.2f}" for v in ear_dbs] if self.per_ear else []))
+            self.journal.record("saved", file=fn)
             self.notify(f"Saved: {fn}")
         
         # Dismiss file browser screen after operation completes
@@ -791,6 +1721,124 @@ class HearCal(App):
                 self.pop_screen()
                 break
 
+    def apply_profile(self, freqs, values, results=None):
+        """Replaces results with (freqs, values) interpolated onto the session grid (preserves dict reference)."""
+        results = self.results if results is None else results
+        grid = sorted(self.freqs)
+        interpolated = interpolate_log(freqs, values, grid)
+        results.clear()
+        for freq, db in zip(grid, interpolated):
+            results[freq] = float(db)
+
+    def surface(self, ear=None):
+        """Returns (levels_dbfs, freqs, raw[level, freq]) over all session levels of one ear (default: active)."""
+        level_results = self.ear_results[self.ear if ear is None else ear]
+        levels = sorted(level_results)
+        grid = sorted(self.freqs)
+        raw = np.array([[level_results[lvl][f] for f in grid] for lvl in levels])
+        return np.array([REFERENCE_LEVELS[lvl]["dbfs"] for lvl in levels]), np.array(grid), raw
+
+    def load_surface(self, fn):
+        """Loads a .npz surface; levels not in REFERENCE_LEVELS are ignored."""
+        levels_dbfs, freqs, raw = load_surface(fn)
+        per_ear = load_surface_ears(fn)
+        order = np.argsort(freqs)
+        known = {level["dbfs"]: idx for idx, level in enumerate(REFERENCE_LEVELS)}
+        ear_results = {}
+        for ear in self.ears:
+            level_results = ear_results[ear] = {}
+            for dbfs, row in zip(levels_dbfs, per_ear.get(ear, raw)):
+                if int(dbfs) in known:
+                    level_results[known[int(dbfs)]] = {}
+                    self.apply_profile(freqs[order], row[order], level_results[known[int(dbfs)]])
+        if not ear_results[self.ear]:
+            raise ValueError(f"No known reference level in {fn}")
+        self.ear_results = ear_results
+        self.level_results = ear_results[self.ear]
+        self.multi_level = len(self.level_results) > 1
+        self.profile = None
+        level = self.reference_level_idx if self.reference_level_idx in self.level_results else min(self.level_results)
+        self.set_reference_level(level)
+
+    def set_reference_level(self, idx):
+        """Switch the reference level; multi-level sessions switch to that level's results."""
+        if self.multi_level:
+            if idx not in self.level_results:
+                raise ValueError(f"Level {idx} is not part of this session")
+        else:
+            for ear, level_results in self.ear_results.items():
+                self.ear_results[ear] = {idx: next(iter(level_results.values()))}
+        self.level_results = self.ear_results[self.ear]
+        self.results = self.level_results[idx]
+        self.reference_level_idx = idx
+        self.journal.record("level", lv=idx)
+
+    def set_ear(self, ear):
+        """Route the test signal to ear and switch to that ear's results."""
+        self.ear = ear
+        self.level_results = self.ear_results[ear]
+        self.results = self.level_results[self.reference_level_idx]
+        self.audio_engine.set_route(EAR_ROUTES[ear])
+        self.journal.record("ear", ear=ear)
+
+    def action_switch_ear(self):
+        if not self.per_ear:
+            self.notify("Both-ears session (start with --per-ear to test each ear).")
+            return
+        self.set_ear(self.ears[(self.ears.index(self.ear) + 1) % len(self.ears)])
+        self.update_ui()
+
+    def action_balance_check(self):
+        """Log the left - right difference per band at the active level."""
+        if not self.per_ear:
+            self.notify("Balance check needs a per-ear session (--per-ear).")
+            return
+        grid = sorted(self.freqs)
+        left, right = (np.array([self.ear_results[ear][self.reference_level_idx][f] for f in grid])
+                       for ear in ("left", "right"))
+        diff = left - right
+        worst = int(np.argmax(np.abs(diff)))
+        self.debug_log.write(f"BALANCE L-R at {REFERENCE_LEVELS[self.reference_level_idx]['dbfs']} dBFS: "
+                             f"mean {diff.mean():+.1f} dB, largest {diff[worst]:+.1f} dB at {grid[worst]:g} Hz")
+        flagged = [f"{f:g} Hz ({d:+.1f})" for f, d in zip(grid, diff) if abs(d) > BALANCE_TOLERANCE_DB]
+        if flagged:
+            self.debug_log.write(f"  beyond +/-{BALANCE_TOLERANCE_DB:g} dB: " + ", ".join(flagged))
+        self.notify(f"{len(flagged)} band(s) differ by more than {BALANCE_TOLERANCE_DB:g} dB between ears."
+                    if flagged else "Ears balanced within tolerance.")
+
+    def action_next_level(self):
+        if not self.multi_level:
+            self.notify("Single-level session (start with --levels for several).")
+            return
+        levels = sorted(self.level_results)
+        self.set_reference_level(levels[(levels.index(self.reference_level_idx) + 1) % len(levels)])
+        self.update_ui()
+
+    def record_result(self, freq, event="set"):
+        ear = {"ear": self.ear} if self.per_ear else {}
+        self.journal.record(event, f=freq, db=self.results[freq], l=self.reference_level_idx, **ear)
+
+    def snapshot(self):
+        levels = {ear: [[lvl, list(res.items())] for lvl, res in level_results.items()]
+                  for ear, level_results in self.ear_results.items()}
+        snap = {"lv": self.reference_level_idx, "i": self.current_idx}
+        if self.per_ear:
+            return {"se": levels, "ear": self.ear, **snap}
+        return {"s": levels["both"], **snap}
+
+    def export_profile(self, ear=None):
+        """Returns (freqs, values) of one ear (default: active) to save: the session grid,
+        or the loaded full-resolution profile with the session's adjustments applied."""
+        ear = self.ear if ear is None else ear
+        results = self.ear_results[ear][self.reference_level_idx]
+        grid = np.array(sorted(self.freqs))
+        current = np.array([results[f] for f in grid])
+        if self.profile is None:
+            return grid, current
+        freqs, values = self.profile[ear]
+        delta = current - interpolate_log(freqs, values, grid)
+        return freqs, values + interpolate_log(grid, delta, freqs)
+
     def action_request_load(self): 
         self.push_screen(FileBrowserScreen(mode="load"))
     
@@ -798,27 +1846,127 @@ class HearCal(App):
         self.push_screen(FileBrowserScreen(mode="save"))
 
     def action_gain_up(self): 
-        self.results[ISO_FREQS[self.current_idx]] += 0.5
+        self.latency.begin("gain_up")
+        freq = self.freqs[self.current_idx]
+        self.results[freq] += 0.5
+        self.manual_steps[freq] = self.manual_steps.get(freq, 0) + 1
+        self.record_result(freq)
         self.update_ui()
 
     def action_gain_down(self): 
-        self.results[ISO_FREQS[self.current_idx]] -= 0.5
+        self.latency.begin("gain_down")
+        freq = self.freqs[self.current_idx]
+        self.results[freq] -= 0.5
+        self.manual_steps[freq] = self.manual_steps.get(freq, 0) + 1
+        self.record_result(freq)
         self.update_ui()
 
     def action_next_freq(self): 
-        self.current_idx = min(len(ISO_FREQS) - 1, self.current_idx + 1)
+        self.current_idx = min(len(self.freqs) - 1, self.current_idx + 1)
+        self.journal.record("band", i=self.current_idx)
         self.update_ui()
 
     def action_prev_freq(self): 
         self.current_idx = max(0, self.current_idx - 1)
+        self.journal.record("band", i=self.current_idx)
         self.update_ui()
 
     def on_mount(self): 
         self.audio_engine.start()
+        self.debug_log = self.query_one("#debug_terminal")
+        self.set_interval(2.0, self.report_latency)
+        self.set_interval(0.5, self.update_meter)
+        self.set_interval(10.0, self.report_levels)
+        self.update_ui()
+        records = SessionJournal.read(self.journal.path)
+        if SessionJournal.needs_recovery(records):
+            changes = SessionJournal.unsaved_changes(records)
+            self.push_screen(RecoveryScreen(changes), callback=lambda restore: self._on_recovery(records, restore))
+        else:
+            self._on_recovery(records, False)
+
+    def _on_recovery(self, records, restore):
+        """Replay the journal if requested, then start a compacted journal for this session."""
+        if restore:
+            ear_results = {}
+            level_idx, current_idx, ear = SessionJournal.replay(records, ear_results)
+            # Journal from a session with other ears: missing ears start from one that is there
+            source = ear_results.get("both") or next(iter(ear_results.values()), {})
+            self.ear_results = {e: ear_results.get(e) or {lvl: dict(res) for lvl, res in source.items()}
+                                for e in self.ears}
+            all_levels = set().union(*self.ear_results.values())
+            for level_results in self.ear_results.values():
+                for lvl in all_levels:
+                    results = level_results.setdefault(lvl, {float(f): 0.0 for f in self.freqs})
+                    if set(results) != set(self.freqs):
+                        # Journal was written with another grid: resample it onto this one
+                        freqs = np.array(sorted(results))
+                        self.apply_profile(freqs, np.array([results[f] for f in freqs]), results)
+            if ear in self.ear_results:
+                self.ear = ear
+            self.level_results = self.ear_results[self.ear]
+            self.multi_level = len(self.level_results) > 1
+            if level_idx is not None:
+                self.reference_level_idx = level_idx
+            for level_results in self.ear_results.values():
+                level_results.setdefault(self.reference_level_idx, {float(f): 0.0 for f in self.freqs})
+            self.results = self.level_results[self.reference_level_idx]
+            if self.per_ear:
+                self.audio_engine.set_route(EAR_ROUTES[self.ear])
+            if current_idx is not None:
+                self.current_idx = min(current_idx, len(self.freqs) - 1)
+            self.notify("Session restored from journal.")
+        self.journal.reset(self.snapshot())
+        self.journal.start()
         self.update_ui()
     
+    def report_latency(self):
+        """Log rolling key-to-sound percentiles for actions measured since the last report."""
+        for action in sorted(self.latency.drain(self.audio_engine.delivered)):
+            self.debug_log.write(self.latency.summary(action))
+
+    def meter_text(self):
+        rms, peak, lufs = self.audio_engine.meter_reading()
+        text = f"OUT  RMS {rms:6.1f} dBFS  PEAK {peak:6.1f} dBFS  S {lufs:6.1f} LUFS"
+        if self.meter_target is not None:
+            text += f"  (target {self.meter_target:.1f}, {rms - self.meter_target:+.1f} dB)"
+        return text
+
+    def update_meter(self):
+        text = self.meter_text()
+        for label in self.screen.query("#meter_label"):
+            if getattr(label, "meter_text", None) != text:  # No repaint while the level is steady
+                label.meter_text = text
+                label.update(text)
+
+    def report_levels(self):
+        """Log the output meter while something steady is playing."""
+        if self.meter_target is not None:
+            self.debug_log.write(self.meter_text())
+
     def on_unmount(self):
+        self.journal.close()
         self.audio_engine.stop()
+        if self.render_process is not None:
+            self.render_process.shutdown()
 
 if __name__ == "__main__": 
-    HearCal().run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="HearCal perceptual loudness matching")
+    parser.add_argument("--grid", type=int, choices=GRID_FRACTIONS, default=3,
+                        help="Test grid resolution in 1/N octave (default: 3, the ISO third-octave bands)")
+    parser.add_argument("--levels", type=str, default=None,
+                        help="Comma-separated reference levels in dBFS for a multi-level session, e.g. -20,-18,-14")
+    parser.add_argument("--per-ear", action="store_true",
+                        help="Stereo session: match each ear separately ([E] switches ear, [B] balance check)")
+    parser.add_argument("--render-workers", type=int, default=None,
+                        help="Synthesis processes (default: one per spare core, up to 4; 0 renders in-process)")
+    args = parser.parse_args()
+    session_levels = None
+    if args.levels:
+        known = {level["dbfs"]: idx for idx, level in enumerate(REFERENCE_LEVELS)}
+        try:
+            session_levels = [known[int(v)] for v in args.levels.split(",")]
+        except (KeyError, ValueError):
+            parser.error(f"--levels must be taken from {sorted(known)}")
+    HearCal(grid_fraction=args.grid, session_levels=session_levels, render_workers=args.render_workers,
+            per_ear=args.per_ear).run()
\ No newline at end of file
@@ -1,13 +1,18 @@
-import os
+import argparse
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from textual import work
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, Button, Label, ListItem, ListView
+from textual.widgets import Header, Footer, Button, Input, Label
 from textual.containers import Vertical, Horizontal
 from textual.binding import Binding
 from textual.screen import Screen
 
+from hearcal_profile import GRID_FRACTIONS, frequency_grid, interpolate_log, load_surface
+from hearcal_widgets import ProfileList
+
 # --- FINER FREQUENCY BANDS (Restored) ---
 BANDS = {
     "Sub": (20, 60),
@@ -19,45 +24,234 @@ BANDS = {
     "Air": (10000, 20000)
 }
 
+def load_csv_profile(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    """Reads a frequency/raw CSV as sorted arrays; for duplicate frequencies the last row wins."""
+    df = pd.read_csv(filename)
+    df = df[df['frequency'] > 0].drop_duplicates('frequency', keep='last').sort_values('frequency')
+    return df['frequency'].to_numpy(dtype=float), df['raw'].to_numpy(dtype=float)
+
+def common_grid(freq_sets: list[np.ndarray]) -> tuple[int, np.ndarray]:
+    """Finest HearCal grid (1/N octave) any input needs, as sorted frequencies.
+
+    The grid spans the range the inputs measured, and every input's first and last
+    frequency is a grid point, so no file loses its end points (e.g. 20 Hz and 20 kHz
+    of the ISO bands) when grids are mixed.
+    """
+    density = max((len(f) - 1) / np.log2(f[-1] / f[0]) for f in freq_sets if len(f) > 1 and f[-1] > f[0])\
+        if any(len(f) > 1 for f in freq_sets) else 0.0
+    # 10% slack: the ISO list (nominal values) is slightly less dense than exact third octaves
+    fraction = next((n for n in GRID_FRACTIONS if n >= 0.9 * density), GRID_FRACTIONS[-1])
+    grid = np.asarray(frequency_grid(fraction), dtype=float)
+    ends = np.array([f[i] for f in freq_sets if len(f) for i in (0, -1)])
+    inside = (grid > ends.min()) & (grid < ends.max())
+    # Rounded like the saved CSV, which also merges ends that are grid points already
+    return fraction, np.unique(np.round(np.concatenate([grid[inside], ends]), 2))
+
+def resample_to_grid(freqs: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Log-frequency interpolation onto grid; NaN outside the measured range (no extrapolation)."""
+    out = interpolate_log(freqs, values, grid)
+    # Tolerance absorbs CSV rounding and nominal vs. exact band centers at the ends
+    out[(grid < freqs[0] * 0.99) | (grid > freqs[-1] * 1.01)] = np.nan
+    return out
+
+# Parsed inputs and averages, reused while the files are unchanged (the
+# service keeps them across requests): path -> (mtime_ns, profile, surface)
+_INPUT_CACHE = {}
+_AVERAGE_CACHE = {}  # ((path, mtime_ns), ...) -> averaging result
+_AVERAGE_CACHE_SIZE = 64
+
+def load_input(filename: str):
+    """Returns (profile, surface) of a CSV profile or .npz surface, cached by mtime.
+
+    profile is sorted (freqs, values); surface is (levels, freqs, raw) for .npz
+    inputs (profile is then its mean over levels), else None.
+    """
+    path = Path(filename).resolve()
+    mtime = path.stat().st_mtime_ns
+    cached = _INPUT_CACHE.get(path)
+    if cached and cached[0] == mtime: return cached[1], cached[2]
+    if path.suffix == '.npz':
+        # Multi-level surface: keep it for the per-level average and
+        # collapse the level axis into one profile for the report
+        levels, freqs, raw = load_surface(path)
+        order = np.argsort(freqs)
+        surface = (levels, freqs[order], raw[:, order])
+        profile = (freqs[order], raw[:, order].mean(axis=0))
+    else:
+        surface, profile = None, load_csv_profile(path)
+    _INPUT_CACHE[path] = (mtime, profile, surface)
+    return profile, surface
+
+def _average(files: list[str]) -> dict:
+    """Common grid, per-point statistics and level surface of files, cached by their mtimes."""
+    key = tuple((str(Path(f).resolve()), Path(f).stat().st_mtime_ns) for f in files)
+    if key in _AVERAGE_CACHE: return _AVERAGE_CACHE[key]
+    # Load every input as sorted (freqs, values)
+    inputs = [load_input(f) for f in files]
+    profiles = [profile for profile, _ in inputs]
+    surfaces = [surface for _, surface in inputs if surface is not None]
+
+    # Resample everything onto one log-frequency grid: files x grid points, NaN = not covered
+    fraction, grid = common_grid([freqs for freqs, _ in profiles])
+    matrix = np.vstack([resample_to_grid(freqs, values, grid) for freqs, values in profiles])
+    count = np.count_nonzero(~np.isnan(matrix), axis=0)
+    covered = count > 0
+    grid, matrix, count = grid[covered], matrix[:, covered], count[covered]
+
+    # Level x frequency average across all surfaces
+    level_grid = None
+    if surfaces:
+        rows = [pd.DataFrame({'level': lvl, 'frequency': grid, 'raw': resample_to_grid(freqs, row, grid)})
+                for levels, freqs, raw in surfaces for lvl, row in zip(levels, raw)]
+        level_grid = pd.concat(rows).pivot_table(index='level', columns='frequency', values='raw', aggfunc='mean')
+    
+    # Calculate Detailed Statistics per grid point (NaN entries are skipped)
+    stats = pd.DataFrame(matrix, columns=grid).agg(['mean', 'min', 'max', 'std', 'var']).T
+    stats.index.name = 'frequency'
+    stats = stats.reset_index().rename(columns={'mean': 'avg', 'var': 'variance'})
+    stats['spread'] = stats['max'] - stats['min']
+    stats['files'] = count
+    stats['coverage'] = count / len(files)
+
+    if len(_AVERAGE_CACHE) >= _AVERAGE_CACHE_SIZE: _AVERAGE_CACHE.pop(next(iter(_AVERAGE_CACHE)))
+    result = _AVERAGE_CACHE[key] = {"fraction": fraction, "stats": stats, "level_grid": level_grid}
+    return result
+
+def average_files(files: list[str], out_dir: str = ".") -> str:
+    """Averages files into hearcal_avg*.csv (and .npz) in out_dir; returns the report."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    result = _average(files)
+    fraction, stats, level_grid = result["fraction"], result["stats"], result["level_grid"]
+    grid = stats['frequency']
+
+    # Output 0: Level x frequency average across all surfaces
+    if level_grid is not None:
+        np.savez(out / "hearcal_avg_surface.npz", levels=level_grid.index.to_numpy(dtype=float),
+                 frequency=level_grid.columns.to_numpy(dtype=float), raw=level_grid.to_numpy(dtype=float))
+    
+    # Output 1: Standard HearCal Profile
+    avg_df = stats[['frequency', 'avg']].rename(columns={'avg': 'raw'})
+    avg_df.to_csv(out / "hearcal_avg.csv", index=False)
+    
+    # Output 2: Detailed Stats CSV
+    stats.to_csv(out / "hearcal_avg_details.csv", index=False)
+    
+    # Build Terminal Report
+    report = []
+    report.append("\n" + "="*75)
+    report.append(" HEARCAL AVERAGER: FILE COMPARISON & AVERAGE")
+    report.append("="*75)
+    report.append(f"Source Files:    {', '.join(files)}")
+    report.append(f"Main Average:    {out / 'hearcal_avg.csv'}")
+    report.append(f"Detailed Stats:  {out / 'hearcal_avg_details.csv'}")
+    report.append(f"Common Grid:     1/{fraction} octave, {len(grid)} points")
+    if level_grid is not None:
+        level_txt = ", ".join(f"{lvl:g}" for lvl in level_grid.index)
+        report.append(f"Level Surface:   {out / 'hearcal_avg_surface.npz'} ({level_txt} dBFS; profile = mean over levels)")
+    report.append("-" * 75)
+    
+    # 1. Global Consistency Metrics
+    avg_spread = stats['spread'].mean()
+    max_spread_row = stats.loc[stats['spread'].idxmax()]
+    
+    report.append("[CONSISTENCY SUMMARY]")
+    report.append(f"  Average Gap:     {avg_spread:.2f} dB (Typical variance across all bands)")
+    report.append(f"  Largest Gap:     {max_spread_row['spread']:.2f} dB at {max_spread_row['frequency']} Hz")
+    partial = stats.loc[stats['files'] < len(files)]
+    report.append(f"  Coverage:        {len(stats) - len(partial)}/{len(stats)} grid points measured in all {len(files)} files")
+    if not partial.empty:
+        points = ", ".join(f"{row.frequency:g} Hz ({row.files}/{len(files)})" for row in partial.head(8).itertuples())
+        more = f" and {len(partial) - 8} more" if len(partial) > 8 else ""
+        report.append(f"  Partial:         {points}{more}")
+    report.append("-" * 75)
+    
+    # 2. Detailed Band Comparison Table
+    report.append(f"{'BAND':<12} | {'AVG VAL':>8} | {'MAX DIFF':>8} | {'VAR':>8} | {'STATUS'}")
+    report.append("-" * 75)
+    
+    for name, (low, high) in BANDS.items():
+        mask = (stats['frequency'] >= low) & (stats['frequency'] < high)
+        band_data = stats.loc[mask]
+        
+        if not band_data.empty:
+            b_val = band_data['avg'].mean()
+            b_spread = band_data['spread'].max()
+            b_var = band_data['variance'].mean()
+            
+            # Logic for status based on spread (difference between files)
+            if band_data['files'].min() < 2: status = "Sparse"
+            elif b_spread < 2.0: status = "Stable"
+            elif b_spread < 5.0: status = "Variable"
+            else:                status = "Unreliable"
+            
+            report.append(f"{name:<12} | {b_val:>8.1f} | {b_spread:>8.1f} | {b_var:>8.1f} | {status}")
+        else:
+            report.append(f"{name:<12} | No Data")
+    
+    # 3. Definitions
+    report.append("-" * 75)
+    report.append("METRIC EXPLANATIONS:")
+    report.append("  AVG VAL:  The final average loudness offset used for your profile.")
+    report.append("  MAX DIFF: The largest disagreement between your test runs in this band.")
+    report.append("  VAR:      Statistical variance. High numbers mean tests were inconsistent.")
+    report.append("  STATUS:   'Stable' means your test runs matched closely in this range.")
+    report.append("            'Sparse' means part of the band was measured in only one file.")
+    report.append("-" * 75)
+    
+    # 4. DIY Sanity Check
+    report.append("[SETUP RELIABILITY]")
+    if avg_spread < 2.5:
+        report.append("  Thumbs Up: Your measurements are very consistent.")
+    elif avg_spread < 6.0:
+        report.append("  Caution: Moderate variation detected. Check for noise or fit issues.")
+    else:
+        report.append("  Warning: Large differences between files. Results may be unreliable.")
+    report.append("="*75 + "\n")
+    
+    return "\n".join(report)
+
 class MultiFileBrowser(Screen):
     """Minimal browser to select multiple hearing profiles."""
     BINDINGS = [
         Binding("escape", "dismiss_screen", "Exit"), 
         Binding("enter", "submit", "Confirm Selection"),
-        Binding("space", "toggle_selection", "Toggle")
+        Binding("space", "toggle_selection", "Toggle"),
+        Binding("up", "move(-1)", show=False),
+        Binding("down", "move(1)", show=False)
     ]
 
     def compose(self) -> ComposeResult:
-        self.files = sorted([f for f in os.listdir('.') if f.endswith('.csv')])
-        self.selected_indices = set()
-        
         with Vertical(id="browser_panel"):
             yield Label("[b]HEARCAL SELECTOR[/b]", id="title")
             yield Label("Select at least 2 files to compare and average.", classes="instr")
-            yield ListView(*[ListItem(Label(f"[ ] {f}")) for f in self.files], id="file_list")
+            yield Input(placeholder="Filter...", id="filter_input")
+            yield ProfileList(multi=True, id="file_list")
             with Horizontal(id="browser_buttons"):
                 yield Button("Cancel", id="cancel", variant="error")
                 yield Button("Process Average", id="confirm", variant="primary")
 
+    def on_mount(self) -> None:
+        self.query_one(ProfileList).focus()
+
     def action_toggle_selection(self) -> None:
-        list_view = self.query_one(ListView)
-        idx = list_view.index
-        if idx is not None:
-            if idx in self.selected_indices:
-                self.selected_indices.remove(idx)
-                list_view.children[idx].query_one(Label).update(f"[ ] {self.files[idx]}")
-            else:
-                self.selected_indices.add(idx)
-                list_view.children[idx].query_one(Label).update(f"[*] {self.files[idx]}")
-
-    def on_list_view_selected(self, event: ListView.Selected) -> None:
+        self.query_one(ProfileList).toggle()
+
+    def action_move(self, delta: int) -> None:
+        self.query_one(ProfileList).action_move(delta)
+
+    def on_profile_list_chosen(self, event: ProfileList.Chosen) -> None:
         self.action_toggle_selection()
 
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.query_one(ProfileList).filter(event.value)
+
     def action_submit(self) -> None:
-        if len(self.selected_indices) < 2:
+        selected = self.query_one(ProfileList).selected
+        if len(selected) < 2:
             self.app.notify("Select at least 2 files.", severity="error")
             return
-        self.dismiss([self.files[i] for i in self.selected_indices])
+        self.dismiss(sorted(selected))
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "confirm": self.action_submit()
@@ -67,7 +261,7 @@ class HearCalAverager(App):
     """Standalone DIY tool to average and compare hearing test results."""
     CSS = """
     Screen { align: center middle; }
-    #browser_panel { width: 70; height: 20; border: thick $primary; padding: 1; background: $surface; }
+    #browser_panel { width: 70; height: 24; border: thick $primary; padding: 1; background: $surface; }
     #file_list { border: solid $accent; margin: 1 0; height: 1fr; }
     #title { text-align: center; }
     .instr { text-align: center; color: $text-muted; text-style: italic; margin-bottom: 1; }
@@ -87,91 +281,19 @@ class HearCalAverager(App):
             self.exit()
 
     def compare_and_average(self, files: list[str]) -> str:
-        # Load and aggregate data
-        data_list = []
-        for f in files:
-            temp_df = pd.read_csv(f)
-            temp_df['filename'] = f
-            data_list.append(temp_df)
-        
-        combined = pd.concat(data_list)
-        
-        # Calculate Detailed Statistics per Frequency
-        stats = combined.groupby('frequency')['raw'].agg(['mean', 'min', 'max', 'std', 'var']).reset_index()
-        stats.rename(columns={'mean': 'avg', 'var': 'variance'}, inplace=True)
-        stats['spread'] = stats['max'] - stats['min']
-        
-        # Output 1: Standard HearCal Profile
-        avg_df = stats[['frequency', 'avg']].rename(columns={'avg': 'raw'})
-        avg_df.to_csv("hearcal_avg.csv", index=False)
-        
-        # Output 2: Detailed Stats CSV
-        stats.to_csv("hearcal_avg_details.csv", index=False)
-        
-        # Build Terminal Report
-        report = []
-        report.append("\n" + "="*75)
-        report.append(" HEARCAL AVERAGER: FILE COMPARISON & AVERAGE")
-        report.append("="*75)
-        report.append(f"Source Files:    {', '.join(files)}")
-        report.append(f"Main Average:    hearcal_avg.csv")
-        report.append(f"Detailed Stats:  hearcal_avg_details.csv")
-        report.append("-" * 75)
-        
-        # 1. Global Consistency Metrics
-        avg_spread = stats['spread'].mean()
-        max_spread_row = stats.loc[stats['spread'].idxmax()]
-        
-        report.append("[CONSISTENCY SUMMARY]")
-        report.append(f"  Average Gap:     {avg_spread:.2f} dB (Typical variance across all bands)")
-        report.append(f"  Largest Gap:     {max_spread_row['spread']:.2f} dB at {max_spread_row['frequency']} Hz")
-        report.append("-" * 75)
-        
-        # 2. Detailed Band Comparison Table
-        report.append(f"{'BAND':<12} | {'AVG VAL':>8} | {'MAX DIFF':>8} | {'VAR':>8} | {'STATUS'}")
-        report.append("-" * 75)
-        
-        for name, (low, high) in BANDS.items():
-            mask = (stats['frequency'] >= low) & (stats['frequency'] < high)
-            band_data = stats.loc[mask]
-            
-            if not band_data.empty:
-                b_val = band_data['avg'].mean()
-                b_spread = band_data['spread'].max()
-                b_var = band_data['variance'].mean()
-                
-                # Logic for status based on spread (difference between files)
-                if b_spread < 2.0:   status = "Stable"
-                elif b_spread < 5.0: status = "Variable"
-                else:                status = "Unreliable"
-                
-                report.append(f"{name:<12} | {b_val:>8.1f} | {b_spread:>8.1f} | {b_var:>8.1f} | {status}")
-            else:
-                report.append(f"{name:<12} | No Data")
-        
-        # 3. Definitions
-        report.append("-" * 75)
-        report.append("METRIC EXPLANATIONS:")
-        report.append("  AVG VAL:  The final average loudness offset used for your profile.")
-        report.append("  MAX DIFF: The largest disagreement between your test runs in this band.")
-        report.append("  VAR:      Statistical variance. High numbers mean tests were inconsistent.")
-        report.append("  STATUS:   'Stable' means your test runs matched closely in this range.")
-        report.append("-" * 75)
-        
-        # 4. DIY Sanity Check
-        report.append("[SETUP RELIABILITY]")
-        if avg_spread < 2.5:
-            report.append("  Thumbs Up: Your measurements are very consistent.")
-        elif avg_spread < 6.0:
-            report.append("  Caution: Moderate variation detected. Check for noise or fit issues.")
-        else:
-            report.append("  Warning: Large differences between files. Results may be unreliable.")
-        report.append("="*75 + "\n")
-        
-        return "\n".join(report)
+        return average_files(files)
 
 if __name__ == "__main__":
-    result = HearCalAverager().run()
-    if result:
-        print(result)
+    parser = argparse.ArgumentParser(description="Average and compare HearCal results.")
+    parser.add_argument("files", nargs="*", help="Profiles to average without the file browser (at least 2)")
+    parser.add_argument("--out", default=".", help="Output directory (default: current directory)")
+    args = parser.parse_args()
+    if args.files:
+        if len(args.files) < 2:
+            parser.error("Select at least 2 files.")
+        print(average_files(args.files, args.out))
+    else:
+        result = HearCalAverager().run()
+        if result:
+            print(result)
 
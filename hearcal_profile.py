@@ -0,0 +1,89 @@
+"""HearCal test grids and profile files, without the UI.
+
+Shared by hearcal.py, hearcal_avg.py and hearcal_service.py; importing it
+costs numpy only.
+"""
+import csv
+import random
+
+import numpy as np
+
+ISO_FREQS = [
+    1000.0, 40.0, 4000.0, 125.0, 800.0, 25.0, 500.0, 12500.0, 63.0, 2500.0, 20.0, 
+    1600.0, 31.5, 10000.0, 80.0, 2000.0, 200.0, 16000.0, 50.0, 6300.0, 315.0, 
+    20000.0, 100.0, 3150.0, 160.0, 5000.0, 250.0, 630.0, 1250.0, 400.0
+]
+
+# Supported test grids: 1/N octave
+GRID_FRACTIONS = (3, 6, 12, 24)
+
+# Ears of per-ear profiles: left/right columns and raw_left/raw_right surfaces
+EARS = ("left", "right")
+
+def frequency_grid(fraction=3):
+    """Test bands in presentation order for a 1/N-octave grid.
+
+    Third octaves use the nominal ISO_FREQS list. Finer grids use exact
+    base-2 band centers around 1 kHz covering 20 Hz to 20 kHz (the end
+    bands lie just outside, as 20 Hz and 20 kHz are not on the grid), with
+    1 kHz first and the rest in a fixed interleaved order.
+    """
+    if fraction == 3:
+        return list(ISO_FREQS)
+    # End steps rounded outward, so the grid spans the range of the ISO bands
+    steps = np.arange(np.floor(fraction * np.log2(20.0 / 1000.0)), np.ceil(fraction * np.log2(20000.0 / 1000.0)) + 1)
+    # Rounded like the saved CSV so profiles round-trip exactly
+    rest = [round(float(1000.0 * 2 ** (k / fraction)), 2) for k in steps if k != 0]
+    random.Random(fraction).shuffle(rest)
+    return [1000.0] + rest
+
+def csv_columns(filename):
+    """Header of a profile CSV."""
+    with open(filename, 'r', newline='') as f:
+        return next(csv.reader(f), [])
+
+def load_profile(filename, column="raw"):
+    """Reads a frequency/raw profile CSV of any resolution, sorted by frequency.
+
+    Per-ear profiles also have left/right columns; column selects one.
+    """
+    freqs, values = [], []
+    with open(filename, 'r') as f:
+        for row in csv.DictReader(f):
+            freqs.append(float(row['frequency']))
+            values.append(float(row[column]))
+    freqs = np.asarray(freqs)
+    values = np.asarray(values)
+    keep = freqs > 0
+    # Duplicate frequencies: the last row wins, as with the former dict-based loader
+    freqs, idx = np.unique(freqs[keep][::-1], return_index=True)
+    return freqs, values[keep][::-1][idx]
+
+def interpolate_log(freqs, values, grid):
+    """Interpolates sorted (freqs, values) linearly in log-frequency onto grid; ends are held."""
+    x = np.log(freqs)
+    xg = np.log(np.asarray(grid, dtype=float))
+    if len(x) == 1:
+        return np.full(len(xg), values[0], dtype=float)
+    i = np.clip(np.searchsorted(x, xg), 1, len(x) - 1)
+    w = np.clip((xg - x[i - 1]) / (x[i] - x[i - 1]), 0.0, 1.0)
+    return values[i - 1] * (1.0 - w) + values[i] * w
+
+def save_surface(filename, levels_dbfs, freqs, raw, ears=None):
+    """Writes a level x frequency matching surface as .npz (levels in dBFS).
+
+    ears ({ear: raw}) adds per-ear surfaces as raw_left / raw_right.
+    """
+    per_ear = {f"raw_{ear}": np.asarray(values, dtype=float) for ear, values in (ears or {}).items()}
+    np.savez(filename, levels=np.asarray(levels_dbfs, dtype=float),
+             frequency=np.asarray(freqs, dtype=float), raw=np.asarray(raw, dtype=float), **per_ear)
+
+def load_surface(filename):
+    """Reads a .npz surface: returns (levels_dbfs, freqs, raw[level, freq])."""
+    with np.load(filename) as data:
+        return data["levels"], data["frequency"], data["raw"]
+
+def load_surface_ears(filename):
+    """Per-ear surfaces of a .npz file as {ear: raw[level, freq]}; empty for both-ears files."""
+    with np.load(filename) as data:
+        return {ear: data[f"raw_{ear}"] for ear in EARS if f"raw_{ear}" in data}
@@ -0,0 +1,162 @@
+"""Spectral QA of HearCal's stimuli: renders every variant and checks it against its design.
+
+Per signal it reports band-energy containment (Welch PSD), the slope error
+of the broadband calibration noises, the level error at every reference
+level (plus peak level at the loudest one) and, for looping renders, the
+discontinuity at the loop seam. Signals of equal length are analysed in
+batches, one Welch / RMS pass per batch.
+
+Usage:
+    python hearcal_qa.py [--grid 3 6 ...] [--seed N] [--json results.json]
+
+Exits with status 1 if any signal is out of tolerance.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from scipy import signal
+
+from hearcal import (GRID_FRACTIONS, LFO_DEPTH, LFO_RATE, REFERENCE_LEVELS, SAMPLE_RATE,
+                     HearCal, WarbleSynth, broadband_noise, frequency_grid)
+
+NPERSEG = 16384  # 2.7 Hz bins: resolves the warble of the 20 Hz band
+WINDOW = "blackmanharris"  # Low sidelobes; main lobe is +/-4 bins wide
+BATCH_BYTES = 64 * 2**20  # Signals analysed per Welch call, by size
+SLOPE_RANGE = (40.0, 16000.0)  # Hz: fit range of the broadband slopes
+NOISE_SLOPES = {"white": 0.0, "pink": -3.0, "brown": -6.0}  # dB/octave of the PSD
+
+# Tolerances: containment in % of power, slope in dB/octave, level in dB,
+# seam as the jump across the loop point in units of the RMS sample step
+LIMITS = {"containment": 97.5, "slope": 0.5, "level": 0.05, "seam": 4.0}
+
+def stimuli(freqs, synth, rng):
+    """Every stimulus the app plays, as dicts with a render() callable and its design targets."""
+    specs = []
+    for freq in sorted(freqs):
+        # Carson bandwidth of the warble: deviation plus the LFO rate
+        sine_band = (freq * (1 - LFO_DEPTH) - LFO_RATE, freq * (1 + LFO_DEPTH) + LFO_RATE)
+        # Looping sines play from the live oscillator, so only one-shot sine renders exist
+        for waveform, looping, band in (("sine", False, sine_band),
+                                        ("noise", False, WarbleSynth.band(freq)),
+                                        ("noise", True, WarbleSynth.band(freq))):
+            n = HearCal.render_length(waveform, looping)
+            render = getattr(synth, waveform)
+            specs.append({"signal": f"{waveform} {freq:g} Hz" + (" loop" if looping else ""), "n": n,
+                          "band": band, "slope": None, "loop": looping,
+                          "render": lambda render=render, freq=freq, n=n: render(freq, n, 1.0)})
+    for noise_type, slope in NOISE_SLOPES.items():
+        # Calibration noise: 10 s, looped by the calibration screen
+        specs.append({"signal": f"{noise_type} noise loop", "n": int(SAMPLE_RATE * 10.0),
+                      "band": None, "slope": slope, "loop": True,
+                      "render": lambda noise_type=noise_type: broadband_noise(noise_type, rng=rng)})
+    return specs
+
+def analyse(batch, specs):
+    """Metrics of each row of batch (float32, one signal per row) against its spec."""
+    # No detrending (the stimuli are zero-mean) and no overlap: both roughly halve the cost of welch,
+    # and even a 2 s render gives five segments
+    freqs, psd = signal.welch(batch, SAMPLE_RATE, window=WINDOW, nperseg=NPERSEG, noverlap=0,
+                               detrend=False, axis=-1)
+    margin = 4 * freqs[1]
+    bands = np.array([s["band"] or (np.nan, np.nan) for s in specs])
+    inside = (freqs >= bands[:, :1] - margin) & (freqs <= bands[:, 1:] + margin)
+    containment = 100.0 * (psd * inside).sum(axis=1) / psd.sum(axis=1)
+
+    # Least-squares dB-per-octave slope of every row at once
+    fit = (freqs >= SLOPE_RANGE[0]) & (freqs <= SLOPE_RANGE[1])
+    slopes = np.polyfit(np.log2(freqs[fit]), 10 * np.log10(psd[:, fit].T), 1)[0]
+
+    # Level as played: the callback scales the unit-RMS render in float32
+    level_error = np.zeros(len(batch))
+    scaled = np.empty_like(batch)
+    for level in REFERENCE_LEVELS:
+        np.multiply(batch, np.float32(level["amplitude"]), out=scaled)
+        rms = np.sqrt(np.einsum("ij,ij->i", scaled, scaled, dtype=np.float64) / batch.shape[1])
+        error = 20 * np.log10(rms) - level["dbfs"]
+        level_error = np.where(np.abs(error) > np.abs(level_error), error, level_error)
+    loudest = max(level["amplitude"] for level in REFERENCE_LEVELS)
+    peak = 20 * np.log10(np.abs(batch).max(axis=1) * loudest)
+
+    step = np.sqrt(np.mean(np.square(np.diff(batch, axis=1), dtype=np.float64), axis=1))
+    seam = np.abs(batch[:, 0].astype(np.float64) - batch[:, -1]) / step
+
+    rows = []
+    for i, spec in enumerate(specs):
+        row = {"signal": spec["signal"],
+               "band": [round(float(f), 1) for f in spec["band"]] if spec["band"] else None,
+               "containment": round(float(containment[i]), 3) if spec["band"] else None,
+               "slope_error": round(float(slopes[i] - spec["slope"]), 3) if spec["slope"] is not None else None,
+               "level_error": round(float(level_error[i]), 4),
+               "peak_dbfs": round(float(peak[i]), 2),
+               "seam": round(float(seam[i]), 2) if spec["loop"] else None}
+        failed = []
+        if row["containment"] is not None and row["containment"] < LIMITS["containment"]:
+            failed.append("containment")
+        if row["slope_error"] is not None and abs(row["slope_error"]) > LIMITS["slope"]:
+            failed.append("slope")
+        if abs(row["level_error"]) > LIMITS["level"]:
+            failed.append("level")
+        if row["seam"] is not None and row["seam"] > LIMITS["seam"]:
+            failed.append("seam")
+        row["failed"] = failed
+        rows.append(row)
+    return rows
+
+def run(specs):
+    """Renders and analyses specs in batches of equal length; returns (rows, render s, analysis s)."""
+    rows, render_time, analysis_time = [], 0.0, 0.0
+    for n in sorted({s["n"] for s in specs}):
+        group = [s for s in specs if s["n"] == n]
+        size = max(1, BATCH_BYTES // (4 * n))
+        for start in range(0, len(group), size):
+            chunk = group[start:start + size]
+            t0 = time.perf_counter()
+            batch = np.empty((len(chunk), n), dtype=np.float32)
+            for row, spec in zip(batch, chunk):
+                row[:] = spec["render"]()
+            t1 = time.perf_counter()
+            rows += analyse(batch, chunk)
+            render_time += t1 - t0
+            analysis_time += time.perf_counter() - t1
+    order = {s["signal"]: i for i, s in enumerate(specs)}
+    rows.sort(key=lambda r: order[r["signal"]])
+    return rows, render_time, analysis_time
+
+def fmt(value, spec):
+    """value formatted by spec, or a right-aligned "-" of the same width for None."""
+    return format(value, spec) if value is not None else "-".rjust(int(spec.strip("+").split(".")[0]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid", type=int, nargs="+", choices=GRID_FRACTIONS, default=[3],
+                        help="Test grids (1/N octave) whose bands are rendered (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Noise seed (default: 0)")
+    parser.add_argument("--json", help="Write per-signal results to this file")
+    args = parser.parse_args()
+
+    freqs = {f for fraction in args.grid for f in frequency_grid(fraction)}
+    synth = WarbleSynth(seed=args.seed)
+    rows, render_time, analysis_time = run(stimuli(freqs, synth, np.random.default_rng(args.seed + 1)))
+
+    print(f"{'signal':<24} {'band Hz':>15} {'in band %':>9} {'slope err':>9} {'level err':>9} "
+          f"{'peak':>6} {'seam':>6}  status")
+    for r in rows:
+        band = f"{r['band'][0]:.0f}-{r['band'][1]:.0f}" if r["band"] else "-"
+        status = "FAIL " + ",".join(r["failed"]) if r["failed"] else "ok"
+        if r["peak_dbfs"] > 0:
+            status += " (clips)"
+        print(f"{r['signal']:<24} {band:>15} {fmt(r['containment'], '9.2f')} {fmt(r['slope_error'], '+9.2f')} "
+              f"{r['level_error']:+9.3f} {r['peak_dbfs']:+6.1f} {fmt(r['seam'], '6.1f')}  {status}")
+    failed = [r for r in rows if r["failed"]]
+    print(f"\n{len(rows)} signals, {len(failed)} out of tolerance; render {render_time:.2f} s, "
+          f"analysis {analysis_time:.2f} s (peak: at {max(l['dbfs'] for l in REFERENCE_LEVELS)} dBFS RMS)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"limits": LIMITS, "signals": rows}, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
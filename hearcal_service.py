@@ -0,0 +1,309 @@
+"""Warm-resident HearCal service: averaging, profile resampling and APO -> TB conversion.
+
+Automation that starts hearcal_avg.py or apo2tbeqpro.py once per job pays
+the pandas/SciPy/Textual imports and re-parses the same files every time.
+The service imports them once and keeps parsed profiles, tokenized APO
+files (the include graph) and averaging results in memory between
+requests; every cache entry is keyed by the file's mtime, so edited files
+are re-read.
+
+Usage:
+    python hearcal_service.py serve [--port N]
+    python hearcal_service.py average a.csv b.npz ... [--out DIR]
+    python hearcal_service.py resample profile.csv [--grid N] [--out file.csv]
+    python hearcal_service.py convert preset.txt ... --out DIR [--on-conflict skip|overwrite|suffix]
+    python hearcal_service.py status
+    python hearcal_service.py stop
+
+Protocol: JSON-RPC 2.0 over TCP on 127.0.0.1, one request or response
+object per line; a connection can carry any number of requests. The
+client resolves paths, so they may be relative to its working directory.
+Requests are handled one at a time.
+
+The service reads and writes files with the permissions of the user
+running it, so a connection must first call auth with the secret the
+server writes to ~/.hearcal_service/<port>.token (readable by that user
+only). A connection is closed on its first line that is not a valid
+request, on an HTTP request line and on a failed or missing auth, so
+web pages posting to the port cannot drive the service.
+"""
+import argparse
+import hmac
+import inspect
+import json
+import math
+import os
+import re
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+TOKEN_DIR = Path.home() / ".hearcal_service"
+HTTP_REQUEST_LINE = re.compile(rb"^[A-Z]+ \S* HTTP/\d")
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+UNAUTHORIZED = -32001
+# The connection is closed after these: the peer is not a HearCal client
+CLOSING_ERRORS = (PARSE_ERROR, INVALID_REQUEST, UNAUTHORIZED)
+
+class ServiceError(Exception):
+    """Error response from the service."""
+
+def token_path(port):
+    return TOKEN_DIR / f"{port}.token"
+
+# --- SERVER ---
+
+def write_token(port):
+    """New secret for a server on port, in a file only this user can read."""
+    TOKEN_DIR.mkdir(mode=0o700, exist_ok=True)
+    os.chmod(TOKEN_DIR, 0o700)
+    path = token_path(port)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(path, 0o600)  # The mode of os.open only applies to a new file
+    token = secrets.token_hex(32)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    return token
+
+class Service:
+    """Request handlers. The heavy imports happen here, once per server process."""
+    METHODS = ("average", "resample", "convert", "status", "stop")
+
+    def __init__(self, token):
+        import hearcal_avg
+        sys.path.insert(0, str(Path(__file__).resolve().parent / "apo_to_tbeqpro"))
+        import apo2tbeqpro
+        self.avg, self.apo = hearcal_avg, apo2tbeqpro
+        self.lock = threading.Lock()  # One request at a time: the caches are plain dicts
+        self.started = time.time()
+        self.requests = Counter()
+        self.server = None
+        self.token = token
+
+    def average(self, files, out_dir="."):
+        if len(files) < 2:
+            raise ValueError("Select at least 2 files.")
+        return {"report": self.avg.average_files(files, out_dir)}
+
+    def resample(self, file, grid=3, out=None):
+        """Profile (CSV, or an .npz surface's mean over levels) on a 1/grid-octave HearCal grid."""
+        if grid not in self.avg.GRID_FRACTIONS:
+            raise ValueError(f"grid must be one of {self.avg.GRID_FRACTIONS}")
+        import numpy as np
+        (freqs, values), _ = self.avg.load_input(file)
+        target = sorted(self.avg.frequency_grid(grid))
+        # Outside the measured range stays unknown (null), as in the averager
+        raw = [None if math.isnan(v) else round(float(v), 4)
+               for v in self.avg.resample_to_grid(freqs, values, np.asarray(target))]
+        if out:
+            with open(out, "w", newline="") as f:
+                f.write("frequency,raw\n")
+                f.writelines(f"{freq:.2f},{db:.2f}\n" for freq, db in zip(target, raw) if db is not None)
+        return {"frequency": target, "raw": raw}
+
+    def convert(self, files, out_dir, policy="suffix"):
+        if policy not in self.apo.CONFLICT_POLICIES:
+            raise ValueError(f"policy must be one of {self.apo.CONFLICT_POLICIES}")
+        # Same naming and include rules as --batch, rendered in this process
+        results, fragments = self.apo.convert_batch(files, Path(out_dir), policy)
+        return {"files": results, "includes": fragments}
+
+    def status(self):
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 1),
+                "requests": dict(self.requests),
+                "cached": {"profiles": len(self.avg._INPUT_CACHE), "averages": len(self.avg._AVERAGE_CACHE),
+                           "apo_files": len(self.apo._TOKEN_CACHE)}}
+
+    def stop(self):
+        # shutdown() waits for serve_forever, which is waiting for this request: run it aside
+        threading.Thread(target=self.server.shutdown).start()
+        return {"stopping": True}
+
+    def handle(self, line: bytes, authenticated=True) -> dict:
+        """One JSON-RPC request line -> response object.
+
+        Until authenticated, only auth is accepted.
+        """
+        def error(rid, code, message):
+            return {"jsonrpc": "2.0", "id": rid, "error": {"code": code, "message": message}}
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return error(None, PARSE_ERROR, str(e))
+        if not isinstance(request, dict):
+            return error(None, INVALID_REQUEST, "Request must be a JSON object")
+        rid, method, params = request.get("id"), request.get("method"), request.get("params", {})
+        if not isinstance(params, dict):
+            return error(rid, INVALID_REQUEST, "params must be a JSON object")
+        if method == "auth":
+            if hmac.compare_digest(str(params.get("token", "")).encode(), self.token.encode()):
+                return {"jsonrpc": "2.0", "id": rid, "result": {"authenticated": True}}
+            return error(rid, UNAUTHORIZED, "Invalid token")
+        if not authenticated:
+            return error(rid, UNAUTHORIZED, "Not authenticated: call auth first")
+        if method not in self.METHODS:
+            return error(rid, METHOD_NOT_FOUND, f"Unknown method: {method}")
+        handler = getattr(self, method)
+        try:
+            # Checked up front, so a TypeError raised while handling is a server error, not bad params
+            inspect.signature(handler).bind(**params)
+        except TypeError as e:
+            return error(rid, INVALID_PARAMS, str(e))
+        with self.lock:
+            self.requests[method] += 1
+            try:
+                result = handler(**params)
+            except Exception as e:
+                return error(rid, SERVER_ERROR, f"{type(e).__name__}: {e}")
+        return {"jsonrpc": "2.0", "id": rid, "result": result}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        authenticated = False
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            if HTTP_REQUEST_LINE.match(line):
+                return  # A browser or other HTTP client: close without answering
+            response = self.server.service.handle(line, authenticated)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            if "error" in response and response["error"]["code"] in CLOSING_ERRORS:
+                return
+            # Before auth every other request fails, so a successful response is the auth
+            authenticated = True
+
+class ServiceServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            # Windows: no other process may bind the port while the service holds it
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+def serve(port=DEFAULT_PORT):
+    # Written before listening, so a client that gets connected finds the current token
+    token = write_token(port)
+    service = Service(token)
+    try:
+        with ServiceServer((HOST, port), RequestHandler) as server:
+            server.service = service
+            service.server = server
+            print(f"HearCal service listening on {HOST}:{server.server_address[1]} (pid {os.getpid()})", flush=True)
+            server.serve_forever()
+    finally:
+        path = token_path(port)
+        # Another service may have started on the port since: leave its token alone
+        if path.exists() and path.read_text() == token:
+            path.unlink()
+
+# --- CLIENT ---
+
+class Client:
+    """Persistent connection to the service; call() sends one request and waits for its response.
+
+    The connection authenticates with the token file of the service on port.
+    """
+    def __init__(self, port=DEFAULT_PORT, timeout=None):
+        self.sock = socket.create_connection((HOST, port), timeout=timeout)
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+        try:
+            token = token_path(port).read_text().strip()
+        except OSError:
+            self.close()
+            raise ServiceError(f"Cannot read the service token {token_path(port)}; "
+                               "the service must run as the same user")
+        self.call("auth", token=token)
+
+    def call(self, method, **params):
+        self.next_id += 1
+        self.file.write(json.dumps({"jsonrpc": "2.0", "id": self.next_id, "method": method,
+                                    "params": params}).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ServiceError("Connection closed by the service")
+        response = json.loads(line)
+        if "error" in response:
+            raise ServiceError(response["error"]["message"])
+        return response["result"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port on {HOST} (default: {DEFAULT_PORT})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="Run the service in the foreground")
+    p = commands.add_parser("average", help="Average profiles (like hearcal_avg.py) and print the report")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--out", default=".", help="Output directory (default: current directory)")
+    p = commands.add_parser("resample", help="Resample a profile onto a HearCal grid")
+    p.add_argument("file")
+    p.add_argument("--grid", type=int, default=3, help="1/N octave grid (default: 3)")
+    p.add_argument("--out", help="Write the resampled profile to this CSV instead of printing it")
+    p = commands.add_parser("convert", help="Convert APO configs to TB Equalizer Pro programs")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--out", required=True, help="Output directory")
+    p.add_argument("--on-conflict", choices=("skip", "overwrite", "suffix"), default="suffix")
+    commands.add_parser("status", help="Uptime, request counts and cache sizes")
+    commands.add_parser("stop", help="Stop the service")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port)
+        return 0
+
+    try:
+        with Client(args.port) as client:
+            if args.command == "average":
+                print(client.call("average", files=[os.path.abspath(f) for f in args.files],
+                                  out_dir=os.path.abspath(args.out))["report"])
+            elif args.command == "resample":
+                result = client.call("resample", file=os.path.abspath(args.file), grid=args.grid,
+                                     out=os.path.abspath(args.out) if args.out else None)
+                if not args.out:
+                    print("frequency,raw")
+                    for freq, db in zip(result["frequency"], result["raw"]):
+                        if db is not None:
+                            print(f"{freq:.2f},{db:.2f}")
+            elif args.command == "convert":
+                result = client.call("convert", files=[os.path.abspath(f) for f in args.files],
+                                     out_dir=os.path.abspath(args.out), policy=args.on_conflict)
+                print(json.dumps(result, indent=2))
+                return 1 if any(r["status"] == "error" for r in result["files"]) else 0
+            else:
+                print(json.dumps(client.call(args.command), indent=2))
+    except ConnectionRefusedError:
+        print(f"HearCal service is not running on port {args.port} (start it with: python hearcal_service.py serve)",
+              file=sys.stderr)
+        return 1
+    except ServiceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Profile file list shared by the HearCal and averager file browsers."""
+import bisect
+import os
+
+from rich.segment import Segment
+from textual import work
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+PROFILE_EXTENSIONS = (".csv", ".npz")
+
+class ProfileList(ScrollView, can_focus=True):
+    """File list drawn with the line API: only visible rows are rendered.
+
+    The directory is read with os.scandir in a worker thread and rows
+    appear in sorted order as batches arrive. filter() narrows the shown
+    names to those containing a substring. In multi mode, marked files
+    are kept in the set selected (file names), so marks survive
+    filtering and cost nothing per row.
+    """
+    BINDINGS = [
+        Binding("up", "move(-1)", show=False),
+        Binding("down", "move(1)", show=False),
+        Binding("pageup", "page(-1)", show=False),
+        Binding("pagedown", "page(1)", show=False),
+        Binding("home", "jump(0)", show=False),
+        Binding("end", "jump(-1)", show=False),
+        Binding("enter", "choose", show=False),
+    ]
+    COMPONENT_CLASSES = {"profile-list--cursor"}
+    DEFAULT_CSS = """
+    ProfileList > .profile-list--cursor { background: $accent; color: $text; }
+    """
+    SCAN_BATCH = 500
+
+    class Chosen(Message):
+        """Enter or click on the highlighted file."""
+        def __init__(self, filename: str):
+            super().__init__()
+            self.filename = filename
+
+    def __init__(self, multi=False, path=".", id=None):
+        super().__init__(id=id)
+        self.multi = multi
+        self.path = path
+        self.names = []  # Every scanned file, sorted
+        self.shown = []  # Names passing the filter, sorted
+        self.selected = set()
+        self.needle = ""
+        self.cursor = 0
+        self.scanning = True
+
+    def on_mount(self) -> None:
+        self._scan()
+
+    @work(thread=True, exclusive=True, group="scan")
+    def _scan(self) -> None:
+        batch = []
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.name.endswith(PROFILE_EXTENSIONS) and entry.is_file():
+                    batch.append(entry.name)
+                    if len(batch) >= self.SCAN_BATCH:
+                        self.app.call_from_thread(self._add, batch)
+                        batch = []
+        self.app.call_from_thread(self._add, batch, True)
+
+    def _add(self, batch, done=False) -> None:
+        current = self.current
+        # Timsort merges the sorted list and the new run in linear time
+        self.names.extend(batch)
+        self.names.sort()
+        self.shown.extend(name for name in batch if self.needle in name.lower())
+        self.shown.sort()
+        self.scanning = not done
+        self._reset(current)
+
+    def filter(self, text: str) -> None:
+        current = self.current
+        self.needle = text.strip().lower()
+        self.shown = [name for name in self.names if self.needle in name.lower()]
+        self._reset(current)
+
+    def _reset(self, current) -> None:
+        """Resize after the shown names changed, keeping the cursor on the same file."""
+        if current is not None:
+            i = bisect.bisect_left(self.shown, current)
+            self.cursor = i if i < len(self.shown) and self.shown[i] == current else min(self.cursor, len(self.shown) - 1)
+        self.cursor = max(0, min(self.cursor, len(self.shown) - 1))
+        self.virtual_size = Size(self.size.width, len(self.shown))
+        self._scroll_to_cursor()
+        self.refresh()
+
+    @property
+    def current(self):
+        """File name under the cursor, or None."""
+        return self.shown[self.cursor] if self.shown else None
+
+    def toggle(self) -> None:
+        """Mark or unmark the file under the cursor."""
+        name = self.current
+        if name is not None:
+            self.selected.symmetric_difference_update({name})
+            self._refresh_row(self.cursor)
+
+    def _refresh_row(self, index: int) -> None:
+        self.refresh(Region(0, index - self.scroll_offset.y, self.size.width, 1))
+
+    def action_move(self, delta: int) -> None:
+        if self.shown:
+            old, self.cursor = self.cursor, max(0, min(len(self.shown) - 1, self.cursor + delta))
+            self._refresh_row(old)
+            self._refresh_row(self.cursor)
+            self._scroll_to_cursor()
+
+    def action_jump(self, index: int) -> None:
+        self.action_move((index % max(1, len(self.shown))) - self.cursor)
+
+    def action_page(self, direction: int) -> None:
+        self.action_move(direction * max(1, self.size.height - 1))
+
+    def action_choose(self) -> None:
+        if self.current is not None:
+            self.post_message(self.Chosen(self.current))
+
+    def _scroll_to_cursor(self) -> None:
+        top = self.scroll_offset.y
+        if self.cursor < top:
+            self.scroll_to(y=self.cursor, animate=False)
+        elif self.cursor >= top + self.size.height:
+            self.scroll_to(y=self.cursor - self.size.height + 1, animate=False)
+
+    def on_resize(self) -> None:
+        self.virtual_size = Size(self.size.width, len(self.shown))
+
+    def on_click(self, event) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        index = offset.y + self.scroll_offset.y
+        if 0 <= index < len(self.shown):
+            if index == self.cursor:
+                self.action_choose()
+            else:
+                self.action_move(index - self.cursor)
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        index = y + self.scroll_offset.y
+        if index >= len(self.shown):
+            if index == 0:
+                text = "Scanning..." if self.scanning else "No matching files"
+                return Strip([Segment(text.ljust(width), self.rich_style)])
+            return Strip.blank(width, self.rich_style)
+        name = self.shown[index]
+        text = f"[{'*' if name in self.selected else ' '}] {name}" if self.multi else name
+        style = self.get_component_rich_style("profile-list--cursor") if index == self.cursor else self.rich_style
+        return Strip([Segment(text[:width].ljust(width), style)])
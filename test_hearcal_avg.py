@@ -0,0 +1,38 @@
+"""Regression checks of the averager's common grid; run with pytest or as a script."""
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from hearcal_avg import average_files
+from hearcal_profile import frequency_grid
+
+def write_profile(path: Path, fraction: int, db: float):
+    freqs = sorted(frequency_grid(fraction))
+    path.write_text("frequency,raw\n" + "".join(f"{f:.2f},{db:.2f}\n" for f in freqs))
+
+def test_fine_grids_cover_iso_range():
+    for fraction in (6, 12, 24):
+        freqs = frequency_grid(fraction)
+        assert min(freqs) <= 20.0 and max(freqs) >= 20000.0, fraction
+
+def test_mixed_grids_keep_end_points():
+    """A 1/6-octave file must not cut the 20 Hz and 20 kHz points of third-octave files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        files = []
+        for i, fraction in enumerate((3, 3, 6)):
+            files.append(str(root / f"profile_{i}.csv"))
+            write_profile(Path(files[-1]), fraction, float(i))
+        average_files(files, tmp)
+        avg = pd.read_csv(root / "hearcal_avg.csv").set_index("frequency")["raw"]
+        details = pd.read_csv(root / "hearcal_avg_details.csv").set_index("frequency")
+    for freq in (20.0, 20000.0):
+        assert freq in avg.index, freq
+        assert details.loc[freq, "files"] == 3, freq
+        assert abs(avg[freq] - 1.0) < 1e-9, freq
+
+if __name__ == "__main__":
+    test_fine_grids_cover_iso_range()
+    test_mixed_grids_keep_end_points()
+    print("ok")